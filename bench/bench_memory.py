@@ -0,0 +1,67 @@
+"""Measures the real peak memory (with tracemalloc) of streaming a calendar
+through iter_pipelined_schedule with and without a memory budget, alongside
+the peak the budget reports. Run with
+`python bench/bench_memory.py [count] [limit_kb]`.
+"""
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from event_parser import date_format_str
+from memory_budget import MemoryBudget
+from pipeline import iter_pipelined_schedule
+
+
+def iter_lines(count: int):
+    """Events over a year, a third of which are in the evening so have to be
+    rescheduled. Lines are generated as they're read, so aren't held in memory.
+    """
+    rng = random.Random(0)
+    start = datetime(year=2023, month=1, day=2)
+    for index in range(count):
+        day = start + timedelta(days=index * 365 // count)
+        hour = rng.randrange(19, 23) if index % 3 == 0 else rng.randrange(9, 17)
+        start_date = day + timedelta(hours=hour, minutes=rng.choice([0, 15, 30]))
+        end_date = start_date + timedelta(minutes=30)
+        yield (
+            f"{start_date.strftime(date_format_str)} -> "
+            f"{end_date.strftime(date_format_str)} - Event {index}"
+        )
+
+
+def measure(name: str, count: int, memory_budget=None):
+    tracemalloc.start()
+    start = time.perf_counter()
+    event_count = 0
+    for batch in iter_pipelined_schedule(
+        iter_lines(count), memory_budget=memory_budget
+    ):
+        event_count += len(batch)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    line = f"{name:<12}{elapsed:8.3f}s  real peak {peak / 1024 / 1024:6.2f}MB"
+    if memory_budget is not None:
+        line += (
+            f"  reported peak {memory_budget.peak / 1024 / 1024:6.2f}MB"
+            f"  ({memory_budget.spilled_runs} runs spilled)"
+        )
+    print(line)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    limit = int(sys.argv[2]) * 1024 if len(sys.argv) > 2 else 1024 * 1024
+    print(f"Streaming {count} events, with a limit of {limit // 1024}KB")
+    measure("no budget", count)
+    measure("budget", count, MemoryBudget(limit))
+
+
+if __name__ == "__main__":
+    main()
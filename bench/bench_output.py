@@ -0,0 +1,59 @@
+"""Compares writing out a schedule with the original click.echo loop against
+output_writer's bulk formatting. Run with `python bench/bench_output.py [count]`.
+"""
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import click
+
+from calendar_event import CalendarEvent
+from event_parser import date_format_str
+from output_writer import write_events
+
+
+def make_events(count: int) -> list[CalendarEvent]:
+    start = datetime(year=2023, month=3, day=6, hour=9)
+    return [
+        {
+            "start_date": start + timedelta(minutes=37 * x),
+            "end_date": start + timedelta(minutes=37 * x + 30),
+            "name": f"Event {x}",
+        }
+        for x in range(count)
+    ]
+
+
+def echo_loop(events: list[CalendarEvent]):
+    for event in events:
+        start_date = event["start_date"].strftime(date_format_str)
+        end_date = event["end_date"].strftime(date_format_str)
+        click.echo(f'{start_date} -> {end_date} - {event["name"]}')
+
+
+def time_it(name: str, function) -> float:
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        start = time.perf_counter()
+        function(devnull)
+        elapsed = time.perf_counter() - start
+    print(f"{name:<14}{elapsed:8.3f}s")
+    return elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    events = make_events(count)
+    print(f"Writing {count} events to {os.devnull}")
+
+    echo_time = time_it("echo loop", lambda _: echo_loop(events))
+    bulk_time = time_it("write_events", lambda stream: write_events(events, stream))
+    print(f"Speed up: {echo_time / bulk_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
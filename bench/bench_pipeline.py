@@ -0,0 +1,75 @@
+"""Compares reading, scheduling and writing out a calendar one stage after
+another against iter_pipelined_schedule, for calendars with and without
+priorities: both the total time and the time until the first events are
+written out. Run with `python bench/bench_pipeline.py [count]`.
+"""
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterator
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from calendar_event import CalendarEvent
+from event_parser import date_format_str, parse_into_events
+from output_writer import write_events
+from pipeline import iter_pipelined_schedule
+from reschedule import adjust_event_schedule
+
+
+def make_lines(count: int, with_priorities: bool) -> list[str]:
+    """Mostly valid events, a few of which overlap or are outside of hours"""
+    rng = random.Random(0)
+    start = datetime(year=2023, month=3, day=6, hour=9)
+    lines = []
+    for index in range(count):
+        day = start + timedelta(days=index // 8 // 5 * 7 + index // 8 % 5)
+        start_date = day + timedelta(hours=index % 8)
+        if rng.random() < 0.01:
+            start_date += timedelta(minutes=rng.choice([30, 12 * 60]))
+        end_date = start_date + timedelta(minutes=45)
+        suffix = f" [priority={rng.randrange(3)}]" if with_priorities else ""
+        lines.append(
+            f"{start_date.strftime(date_format_str)} -> "
+            f"{end_date.strftime(date_format_str)} - Event {index}{suffix}"
+        )
+
+    return lines
+
+
+def run_sequentially(lines: list[str]) -> Iterator[list[CalendarEvent]]:
+    yield adjust_event_schedule(parse_into_events("\n".join(lines)))
+
+
+def run_pipelined(lines: list[str]) -> Iterator[list[CalendarEvent]]:
+    return iter_pipelined_schedule(lines)
+
+
+def time_it(name: str, function, lines: list[str]) -> float:
+    first_output_time = None
+    with open(os.devnull, "w") as devnull:
+        start = time.perf_counter()
+        for events in function(lines):
+            write_events(events, devnull)
+            if first_output_time is None:
+                first_output_time = time.perf_counter() - start
+        elapsed = time.perf_counter() - start
+    print(f"{name:<12}{elapsed:8.3f}s total{first_output_time:8.3f}s to first output")
+    return elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    for with_priorities in [False, True]:
+        lines = make_lines(count, with_priorities)
+        print(f"{count} events, {'with' if with_priorities else 'no'} priorities")
+        sequential_time = time_it("sequential", run_sequentially, lines)
+        pipelined_time = time_it("pipelined", run_pipelined, lines)
+        print(f"Speed up: {sequential_time / pipelined_time:.2f}x\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Compares the list and timeline backends of adjust_event_schedule on a dense
+calendar spanning several years, and reports how much memory the timeline
+takes. Run with `python bench/bench_timeline.py [count] [years]`.
+"""
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from calendar_event import CalendarEvent
+from reschedule import (
+    adjust_event_schedule,
+    slot_into_timeline,
+    split_valid_events_on_timeline,
+)
+
+
+def make_events(count: int, years: int) -> list[CalendarEvent]:
+    rng = random.Random(0)
+    start = datetime(year=2023, month=1, day=2)
+    events = []
+    for index in range(count):
+        start_date = start + timedelta(
+            days=rng.randrange(365 * years), minutes=rng.randrange(6, 20 * 4) * 15
+        )
+        events.append(
+            {
+                "start_date": start_date,
+                "end_date": start_date + timedelta(minutes=rng.randrange(1, 9) * 15),
+                "name": f"Event {index}",
+            }
+        )
+
+    return events
+
+
+def time_it(name: str, function) -> float:
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<10}{elapsed:8.3f}s")
+    return elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    years = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    events = make_events(count, years)
+    print(f"Scheduling {count} events over {years} years")
+
+    list_time = time_it("list", lambda: adjust_event_schedule(events))
+    timeline_time = time_it(
+        "timeline", lambda: adjust_event_schedule(events, backend="timeline")
+    )
+    print(f"Speed up: {list_time / timeline_time:.1f}x")
+
+    timeline, to_be_rescheduled = split_valid_events_on_timeline(events)
+    for *_, event in to_be_rescheduled.pop_all():
+        slot_into_timeline(event, timeline)
+    print(
+        f"Timeline memory: {timeline.memory_usage() / 1024:.0f}KiB for "
+        f"{timeline.day_count} days, {len(timeline)} events (not counting the "
+        f"events themselves)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,28 @@
-from datetime import datetime
-from typing import TypedDict
+from datetime import datetime, timedelta
+from typing import NotRequired, TypedDict
+
+
+DEFAULT_PRIORITY = 0
 
 
 class CalendarEvent(TypedDict):
     name: str
     start_date: datetime
     end_date: datetime
+    # Higher priorities keep their slot over lower ones when events overlap
+    priority: NotRequired[int]
+    # How long the event needs when it has to be moved, if not its full length
+    duration: NotRequired[timedelta]
+    # Stable identifier of the input event, kept when it is rescheduled
+    id: NotRequired[str]
+
+
+def get_priority(event: CalendarEvent) -> int:
+    return event.get("priority", DEFAULT_PRIORITY)
+
+
+def get_duration(event: CalendarEvent) -> timedelta:
+    if "duration" in event:
+        return event["duration"]
+
+    return event["end_date"] - event["start_date"]
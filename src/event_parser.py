@@ -1,6 +1,6 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 import re
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 from calendar_event import CalendarEvent
 
 
@@ -18,29 +18,46 @@ def parse_into_events(message: str) -> list[CalendarEvent]:
     Returns:
         list[Event]: A list of Event dicts of processed data
     """
-    lines = [x.strip() for x in message.splitlines()]
+    return list(iter_events(message.splitlines()))
 
+
+def iter_events(lines: Iterable[str]) -> Iterator[CalendarEvent]:
+    """Parses lines into structured dicts for Event details one at a time, so
+    that input can be streamed through. See parse_line for details on the
+    structure needed for each line.
+
+    Args:
+        lines (Iterable[str]): The lines of events
+
+    Raises:
+        ParseMessageError: Raised once all lines have been read if any were not
+        in the correct structure
+
+    Yields:
+        Event: Event dicts of processed data
+    """
     errors = []
-    events = []
     for line in lines:
+        line = line.strip()
         try:
             event = parse_line(line)
             if event:
-                events.append(event)
+                yield event
         except ParseLineException as e:
-            errors.append(line)
+            errors.append((line, str(e)))
 
     if errors:
         raise ParseMessageException(lines_and_errors=errors)
 
-    return events
-
 
 def parse_line(line: str) -> Optional[CalendarEvent]:
     """Parses a single line of the format <start_date> -> <end_date> - <name>
     into a structured dict of properties. Dates must be in format
     YYYY/MM/DD HH:mm.
 
+    The name may optionally end in a suffix of options, e.g.
+    "Meet Jamie [priority=2, duration=30]". See parse_options for details.
+
     Args:
         line (str): The line to parse
 
@@ -71,11 +88,85 @@ def parse_line(line: str) -> Optional[CalendarEvent]:
     if end_date < start_date:
         raise ParseLineException("End date is before start date")
 
-    return {
+    name, options = split_options_suffix(second_split_parts[0])
+    if not name:
+        raise ParseLineException("Line is not structured correctly")
+
+    event: CalendarEvent = {
         "start_date": start_date,
         "end_date": end_date,
-        "name": second_split_parts[0],
+        "name": name,
     }
+    if options:
+        priority, duration = parse_options(options)
+        if priority is not None:
+            event["priority"] = priority
+        if duration is not None:
+            event["duration"] = duration
+
+    return event
+
+
+options_suffix_regex = re.compile(r"^(.*?)\s*\[([^\[\]]*)\]$")
+option_regex = re.compile(r"^\s*(priority|duration)\s*=\s*(\S+)\s*$")
+
+
+def split_options_suffix(raw_name: str) -> tuple[str, Optional[str]]:
+    """Splits a trailing "[key=value, ...]" suffix off an event name. Brackets
+    that don't only contain priority and duration options (e.g. "Lunch [tbc]"
+    or "Standup [team=core]") are left as part of the name.
+    """
+    match = options_suffix_regex.match(raw_name)
+    if not match:
+        return raw_name, None
+
+    name, raw_options = match.groups()
+    if not all(option_regex.match(x) for x in raw_options.split(",")):
+        return raw_name, None
+
+    return name, raw_options
+
+
+def parse_options(raw_options: str) -> tuple[Optional[int], Optional[timedelta]]:
+    """Parses the options of an event name suffix. Supported options are:
+        - priority: an integer, higher priorities keep their slot on overlaps
+        - duration: minutes the event needs if it has to be rescheduled
+
+    Args:
+        raw_options (str): The comma separated key=value options
+
+    Raises:
+        ParseLineException: Raised for repeated or invalid options
+
+    Returns:
+        tuple[Optional[int], Optional[timedelta]]: The priority and duration,
+        None for any that weren't given
+    """
+    options: dict[str, str] = {}
+    for raw_option in raw_options.split(","):
+        key, value = option_regex.match(raw_option).groups()  # type: ignore[union-attr]
+        if key in options:
+            raise ParseLineException(f"Option {key} is given more than once")
+        options[key] = value
+
+    priority = None
+    if "priority" in options:
+        try:
+            priority = int(options["priority"])
+        except ValueError as exception:
+            raise ParseLineException("Priority must be an integer") from exception
+
+    duration = None
+    if "duration" in options:
+        try:
+            minutes = int(options["duration"])
+        except ValueError as exception:
+            raise ParseLineException("Duration must be in minutes") from exception
+        if minutes <= 0:
+            raise ParseLineException("Duration must be positive")
+        duration = timedelta(minutes=minutes)
+
+    return priority, duration
 
 
 date_format_str = "%Y/%m/%d %H:%M"
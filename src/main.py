@@ -1,12 +1,19 @@
 import sys
 from datetime import datetime
-from typing import Optional
+from typing import IO, Iterable, Optional
 
 import click
 
 from calendar_event import CalendarEvent
 from event_parser import ParseMessageException, date_format_str, parse_into_events
-from reschedule import adjust_event_schedule
+from memory_budget import MemoryBudget
+from output_writer import MissingDependencyException, write_columnar, write_events
+from pipeline import iter_pipelined_schedule
+from reschedule import Backend, adjust_event_schedule
+from schedule_diff import EventChange, assign_event_ids, track_schedule_changes
+
+
+BYTES_IN_MB = 1024 * 1024
 
 
 def display_welcome() -> bool:
@@ -20,6 +27,11 @@ def display_welcome() -> bool:
     click.echo(f"Please enter entries in the form: {entry_form_text}")
     date_form_text = click.style("YYYY/MM/DD HH:mm", fg="yellow")
     click.echo(f"Dates must be in the form: {date_form_text}.")
+    options_form_text = click.style("[priority=2, duration=30]", fg="cyan")
+    click.echo(
+        f"Names can optionally end in {options_form_text}, where higher priorities"
+        " keep their slot and duration is the minutes needed if rescheduled."
+    )
 
     should_proceed = click.confirm("\nReady to proceed?")
     if not should_proceed:
@@ -38,45 +50,175 @@ def open_editor() -> Optional[str]:
     return message
 
 
-def parse_events(message: str) -> list[CalendarEvent]:
+def parse_events(message: str, err: bool = False) -> list[CalendarEvent]:
     try:
         events = parse_into_events(message)
     except ParseMessageException as exception:
-        click.echo(f"There are errors with these lines of input:")
-        for line, error in exception.lines_and_errors:
-            click.echo(f'"{line}" - {error}')
+        print_parse_errors(exception, err)
         sys.exit(1)
 
     return events
 
 
+def print_parse_errors(exception: ParseMessageException, err: bool = False):
+    click.echo(f"There are errors with these lines of input:", err=err)
+    for line, error in exception.lines_and_errors:
+        click.echo(f'"{line}" - {error}', err=err)
+
+
 def print_events(events: list[CalendarEvent]):
     click.echo(f"Here are the {len(events)} that we've been able to schedule:")
-    for event in events:
-        start_date = date_to_str(event["start_date"])
-        end_date = date_to_str(event["end_date"])
-        click.echo(f'{start_date} -> {end_date} - {event["name"]}')
+    write_events(events, sys.stdout)
 
 
-def date_to_str(date: datetime) -> str:
-    return date.strftime(date_format_str)
+def print_pipelined_events(
+    lines: Iterable[str], memory_budget: Optional[MemoryBudget] = None
+):
+    event_count = 0
+    try:
+        for events in iter_pipelined_schedule(lines, memory_budget=memory_budget):
+            write_events(events, sys.stdout)
+            event_count += len(events)
+    except ParseMessageException as exception:
+        print_parse_errors(exception, err=True)
+        sys.exit(1)
 
+    click.echo(f"Scheduled {event_count} events.", err=True)
 
-@click.command()
-def main():
-    should_proceed = display_welcome()
-    if not should_proceed:
-        sys.exit(1)
 
-    message = open_editor()
-    if not message:
+def print_memory_usage(memory_budget: MemoryBudget):
+    peak = memory_budget.peak / BYTES_IN_MB
+    limit = memory_budget.limit / BYTES_IN_MB
+    click.echo(
+        f"Peak memory use: {peak:.1f}MB of events (limit {limit:.1f}MB),"
+        f" with {memory_budget.spilled_runs} runs spilled to disk.",
+        err=True,
+    )
+
+
+def save_columnar_events(events: list[CalendarEvent], path: str, err: bool = False):
+    try:
+        write_columnar(events, path)
+    except MissingDependencyException as exception:
+        click.echo(f"Unable to write {path}: {exception}", err=True)
         sys.exit(1)
 
-    events = parse_events(message)
-    click.echo(f"You gave us {len(events)} events.")
+    click.echo(f"Saved the schedule to {path}", err=err)
+
+
+def print_event_changes(changes: Iterable[EventChange], show_header: bool = True):
+    if show_header:
+        click.echo("Here are the events that we've had to move:")
+    for change in changes:
+        if not change["rescheduled"]:
+            continue
+
+        original_start_date = date_to_str(change["original_start_date"])
+        original_end_date = date_to_str(change["original_end_date"])
+        start_date = date_to_str(change["start_date"])
+        end_date = date_to_str(change["end_date"])
+        click.echo(
+            f'{change["id"]}: {original_start_date} -> {original_end_date}'
+            f' => {start_date} -> {end_date} - {change["name"]}'
+        )
 
-    scheduled_events = adjust_event_schedule(events)
-    print_events(scheduled_events)
+
+def date_to_str(date: datetime) -> str:
+    return date.strftime(date_format_str)
+
+
+@click.command()
+@click.option(
+    "--diff",
+    is_flag=True,
+    help="Only output the events that were moved, with their original times.",
+)
+@click.option(
+    "--columnar-output",
+    type=click.Path(dir_okay=False, writable=True),
+    help="Also save the schedule to a .parquet or Arrow file (needs pyarrow).",
+)
+@click.option(
+    "--input",
+    "input_file",
+    type=click.File("r"),
+    help="Read events from a file (or - for stdin) instead of an editor.",
+)
+@click.option(
+    "--backend",
+    type=click.Choice(["list", "timeline"]),
+    default="list",
+    show_default=True,
+    help="How to hold the schedule while building it, with the same result.",
+)
+@click.option(
+    "--memory-limit",
+    type=click.IntRange(min=1),
+    help="Spill events waiting to be rescheduled to disk beyond roughly this"
+    " many MB of events, and report the peak. Only when streaming --input.",
+)
+def main(
+    diff: bool,
+    columnar_output: Optional[str],
+    input_file: Optional[IO[str]],
+    backend: Backend,
+    memory_limit: Optional[int],
+):
+    memory_budget = MemoryBudget(memory_limit * BYTES_IN_MB) if memory_limit else None
+
+    # Only the full schedule on the list backend can be streamed out as it's
+    # being scheduled
+    is_streamed = bool(input_file) and not diff and not columnar_output
+    is_streamed = is_streamed and backend == "list"
+    if memory_budget and not is_streamed:
+        # Otherwise every event is held in memory anyway, so spilling can't help
+        raise click.UsageError(
+            "--memory-limit only works when streaming events from --input,"
+            " without --diff, --columnar-output or --backend timeline."
+        )
+
+    # With --input, only the schedule (or the changes with --diff) is written
+    # to stdout, and everything else to stderr, whichever way it's scheduled
+    if is_streamed:
+        print_pipelined_events(input_file, memory_budget)
+        if memory_budget:
+            print_memory_usage(memory_budget)
+        return
+
+    if input_file:
+        message = input_file.read()
+    else:
+        should_proceed = display_welcome()
+        if not should_proceed:
+            sys.exit(1)
+
+        message = open_editor()
+        if not message:
+            sys.exit(1)
+
+    events = parse_events(message, err=bool(input_file))
+    if not input_file:
+        click.echo(f"You gave us {len(events)} events.")
+
+    if diff:
+        events = assign_event_ids(events)
+
+    # Only events with ids (see assign_event_ids) can be recorded
+    rescheduled_ids: Optional[set[str]] = set() if diff else None
+    scheduled_events = adjust_event_schedule(events, backend, rescheduled_ids)
+    if rescheduled_ids is not None:
+        changes = track_schedule_changes(events, scheduled_events, rescheduled_ids)
+        print_event_changes(changes, show_header=not input_file)
+    elif input_file:
+        write_events(scheduled_events, sys.stdout)
+    else:
+        print_events(scheduled_events)
+
+    if input_file:
+        click.echo(f"Scheduled {len(scheduled_events)} events.", err=True)
+
+    if columnar_output:
+        save_columnar_events(scheduled_events, columnar_output, err=bool(input_file))
 
 
 if __name__ == "__main__":
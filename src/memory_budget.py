@@ -0,0 +1,151 @@
+import heapq
+import pickle
+import sys
+import tempfile
+from typing import IO, Generic, Iterator, Optional, TypeVar
+
+from calendar_event import CalendarEvent
+
+
+# Items of a SpillingHeap: tuples of sort keys ending with the event itself
+T = TypeVar("T", bound=tuple)
+
+# A heap only spills once the events it holds in memory make up at least this
+# fraction of the budget, so that it isn't spilled one event at a time when the
+# rest of the schedule is what's taking up the budget
+MIN_RUN_FRACTION = 8
+
+
+class MemoryBudget:
+    """Tracks the approximate number of bytes of events held in memory while
+    scheduling, against a limit beyond which whatever can be is spilled to disk.
+
+    Only events in a SpillingHeap can be spilled. The schedule being built is
+    held in memory whatever the limit, so the peak can still go well over it.
+    Only the events themselves are counted, not the lists and tuples holding
+    them.
+    """
+
+    def __init__(self, limit: int):
+        if limit <= 0:
+            raise ValueError("Memory limit must be positive")
+
+        self.limit = limit
+        self.used = 0
+        self.peak = 0
+        self.spilled_runs = 0
+
+    @property
+    def is_exceeded(self) -> bool:
+        return self.used > self.limit
+
+    def reserve(self, size: int) -> None:
+        self.used += size
+        self.peak = max(self.peak, self.used)
+
+    def release(self, size: int) -> None:
+        self.used -= size
+
+
+def approximate_event_size(event: CalendarEvent) -> int:
+    """The approximate size in bytes of an event and the values it holds"""
+    return sys.getsizeof(event) + sum(sys.getsizeof(x) for x in event.values())
+
+
+class SpillingHeap(Generic[T]):
+    """A min-heap of (key, ..., event) tuples that are pushed one at a time and
+    then all popped in order at once.
+
+    Given a MemoryBudget, whenever it's exceeded the items held in memory are
+    sorted and written to a temporary file as a run, and popping merges the
+    runs back together with whatever is still in memory. Items must be
+    picklable and never compare equal, so the order is the same either way.
+    """
+
+    def __init__(self, memory_budget: Optional[MemoryBudget] = None):
+        self.memory_budget = memory_budget
+        self._items: list[T] = []
+        self._items_size = 0
+        self._runs: list[IO[bytes]] = []
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[T]:
+        """Iterates over the items in no particular order, reading any spilled
+        runs from disk without reserving them.
+        """
+        yield from self._items
+        for run in self._runs:
+            yield from iter_run(run)
+
+    @property
+    def run_count(self) -> int:
+        return len(self._runs)
+
+    def push(self, item: T) -> None:
+        heapq.heappush(self._items, item)
+        self._length += 1
+        if self.memory_budget is None:
+            return
+
+        self._items_size += approximate_event_size(item[-1])
+        min_run_size = self.memory_budget.limit // MIN_RUN_FRACTION
+        if self.memory_budget.is_exceeded and self._items_size >= min_run_size:
+            self.spill()
+
+    def spill(self) -> None:
+        """Writes the items held in memory to disk as a sorted run"""
+        if not self._items:
+            return
+
+        run = tempfile.TemporaryFile()
+        for item in sorted(self._items):
+            pickle.dump(item, run, protocol=pickle.HIGHEST_PROTOCOL)
+        self._runs.append(run)
+        self._items = []
+
+        if self.memory_budget is not None:
+            self.memory_budget.release(self._items_size)
+            self.memory_budget.spilled_runs += 1
+        self._items_size = 0
+
+    def pop_all(self) -> Iterator[T]:
+        """Pops every item in order, leaving the heap empty. Items read back
+        from disk are reserved against the memory budget again.
+        """
+        if not self._runs:
+            while self._items:
+                self._length -= 1
+                yield heapq.heappop(self._items)
+            return
+
+        items = sorted(self._items)
+        runs = self._runs
+        self._items = []
+        self._items_size = 0
+        self._runs = []
+        try:
+            for item in heapq.merge(items, *(self._iter_run(x) for x in runs)):
+                self._length -= 1
+                yield item
+        finally:
+            for run in runs:
+                run.close()
+
+    def _iter_run(self, run: IO[bytes]) -> Iterator[T]:
+        for item in iter_run(run):
+            if self.memory_budget is not None:
+                self.memory_budget.reserve(approximate_event_size(item[-1]))
+            yield item
+
+
+def iter_run(run: IO[bytes]) -> Iterator[T]:
+    """Reads the items of a run from the start"""
+    run.seek(0)
+    while True:
+        try:
+            yield pickle.load(run)
+        except EOFError:
+            return
@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta
+from typing import IO, Iterable, Iterator
+
+from calendar_event import CalendarEvent
+
+try:
+    import pyarrow
+    import pyarrow.feather
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+MINUTES_IN_DAY = 24 * 60
+ONE_MINUTE = timedelta(minutes=1)
+
+# "HH:MM" for every minute of the day, indexed by minute of the day
+minute_strs = [f"{hour:02d}:{minute:02d}" for hour in range(24) for minute in range(60)]
+
+
+def format_events(
+    events: list[CalendarEvent], chunk_size: int = 10_000
+) -> Iterator[str]:
+    """Formats events into lines of <start_date> -> <end_date> - <name>, in
+    chunks of many lines joined together so they can be written out in bulk.
+
+    Rather than formatting each date separately, dates are turned into integer
+    minute offsets from the first day, which index into a table of day strings
+    (built once per day the events cover) and a table of minute strings.
+
+    Args:
+        events (list[Event]): The events to format
+        chunk_size (int, optional): The number of lines in each chunk.
+        Defaults to 10_000.
+
+    Yields:
+        str: Chunks of newline terminated lines
+    """
+    if not events:
+        return
+
+    epoch = min(x["start_date"] for x in events).replace(hour=0, minute=0)
+    start_offsets = [(x["start_date"] - epoch) // ONE_MINUTE for x in events]
+    end_offsets = [(x["end_date"] - epoch) // ONE_MINUTE for x in events]
+    day_strs = build_day_strs(epoch, max(end_offsets) // MINUTES_IN_DAY + 1)
+
+    for chunk_start in range(0, len(events), chunk_size):
+        chunk_end = chunk_start + chunk_size
+        lines = [
+            f"{day_strs[start // MINUTES_IN_DAY]}{minute_strs[start % MINUTES_IN_DAY]}"
+            f" -> {day_strs[end // MINUTES_IN_DAY]}{minute_strs[end % MINUTES_IN_DAY]}"
+            f" - {event['name']}\n"
+            for start, end, event in zip(
+                start_offsets[chunk_start:chunk_end],
+                end_offsets[chunk_start:chunk_end],
+                events[chunk_start:chunk_end],
+            )
+        ]
+        yield "".join(lines)
+
+
+def build_day_strs(epoch: datetime, day_count: int) -> list[str]:
+    """Builds the "YYYY/MM/DD " prefix of every day from epoch onwards"""
+    return [(epoch + timedelta(days=x)).strftime("%Y/%m/%d ") for x in range(day_count)]
+
+
+def write_events(
+    events: list[CalendarEvent], stream: IO[str], chunk_size: int = 10_000
+) -> None:
+    """Writes events to a text stream in large chunks. See format_events."""
+    for chunk in format_events(events, chunk_size=chunk_size):
+        stream.write(chunk)
+    stream.flush()
+
+
+def write_columnar(events: Iterable[CalendarEvent], path: str) -> None:
+    """Writes events to a columnar file with name, start_date and end_date
+    columns. Paths ending in .parquet are written as Parquet, and anything else
+    as an Arrow (Feather) file. Requires the optional pyarrow dependency.
+
+    Args:
+        events (Iterable[Event]): The events to write
+        path (str): The file to write to
+
+    Raises:
+        MissingDependencyException: Raised if pyarrow isn't installed
+    """
+    if pyarrow is None:
+        raise MissingDependencyException(
+            "pyarrow must be installed to write columnar files"
+        )
+
+    names = []
+    start_dates = []
+    end_dates = []
+    for event in events:
+        names.append(event["name"])
+        start_dates.append(event["start_date"])
+        end_dates.append(event["end_date"])
+
+    table = pyarrow.table(
+        {
+            "name": pyarrow.array(names, type=pyarrow.string()),
+            "start_date": pyarrow.array(start_dates, type=pyarrow.timestamp("s")),
+            "end_date": pyarrow.array(end_dates, type=pyarrow.timestamp("s")),
+        }
+    )
+    if path.endswith(".parquet"):
+        pyarrow.parquet.write_table(table, path)
+    else:
+        pyarrow.feather.write_feather(table, path)
+
+
+class MissingDependencyException(Exception):
+    pass
@@ -0,0 +1,165 @@
+import queue
+import threading
+from itertools import islice
+from typing import Callable, Iterable, Iterator, Optional, TypeVar
+
+from calendar_event import CalendarEvent
+from event_parser import iter_events
+from memory_budget import MemoryBudget
+from reschedule import iter_rescheduled_events, split_valid_events
+
+
+T = TypeVar("T")
+
+DEFAULT_BATCH_SIZE = 1_000
+DEFAULT_QUEUE_SIZE = 16
+
+# How often (in seconds) a blocked stage checks whether the pipeline has stopped
+POLL_INTERVAL = 0.1
+
+end_of_queue = object()
+
+
+def iter_pipelined_schedule(
+    lines: Iterable[str],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    memory_budget: Optional[MemoryBudget] = None,
+) -> Iterator[list[CalendarEvent]]:
+    """Reads and reschedules events with the same result as adjust_event_schedule,
+    but overlapping the work of each stage rather than running them one after
+    another:
+        - a reader thread reads and parses lines,
+        - a scheduler thread sorts events into those inside and outside of
+          hours as they're parsed. If every event inside hours has the same
+          priority, it also checks them for overlaps as they're parsed.
+          Otherwise that waits until all events are read. It then slots the
+          rest in.
+        - the caller gets batches of the final schedule as soon as they're
+          known to be final, so can write them out while the rest is still
+          being rescheduled.
+
+    The threads share the GIL, so this mostly helps with reading from a slow
+    source and with getting the first events out sooner, rather than speeding
+    up the scheduling itself (see bench/bench_pipeline.py).
+
+    Stages pass batches of events through queues of at most queue_size batches,
+    so a slow writer holds back the scheduler. That doesn't bound memory use,
+    which still grows with the size of the input: nothing is yielded until all
+    events are read, so until then the scheduler holds every valid event and
+    every event to be rescheduled, and afterwards the part of the schedule
+    that isn't final yet. A memory_budget only lets the events to be
+    rescheduled be spilled to disk.
+
+    Args:
+        lines (Iterable[str]): The lines of events to read, e.g. an open file
+        batch_size (int, optional): The number of events passed between stages
+        at a time. Defaults to DEFAULT_BATCH_SIZE.
+        queue_size (int, optional): The number of batches each queue can hold.
+        Defaults to DEFAULT_QUEUE_SIZE.
+        memory_budget (MemoryBudget, optional): A budget for the events held
+        by the scheduler, beyond which the events to be rescheduled are spilled
+        to disk. Events are released from it once they're handed over to the
+        caller. Defaults to no limit.
+
+    Raises:
+        ParseMessageException: Raised, before any events are yielded, if any
+        lines are not in the correct structure
+
+    Yields:
+        list[Event]: Batches of the final schedule, in order
+    """
+    parsed_events: queue.Queue = queue.Queue(maxsize=queue_size)
+    scheduled_events: queue.Queue = queue.Queue(maxsize=queue_size)
+    stopped = threading.Event()
+
+    def schedule() -> Iterator[CalendarEvent]:
+        sorted_events, to_be_rescheduled = split_valid_events(
+            iter_from_queue(parsed_events, stopped), memory_budget
+        )
+        return iter_rescheduled_events(sorted_events, to_be_rescheduled)
+
+    stages = [
+        threading.Thread(
+            target=put_into_queue,
+            args=(lambda: iter_events(lines), batch_size, parsed_events, stopped),
+            name="pipeline-reader",
+            daemon=True,
+        ),
+        threading.Thread(
+            target=put_into_queue,
+            args=(schedule, batch_size, scheduled_events, stopped),
+            name="pipeline-scheduler",
+            daemon=True,
+        ),
+    ]
+    for stage in stages:
+        stage.start()
+
+    try:
+        yield from iter_batches_from_queue(scheduled_events, stopped)
+    finally:
+        # Let the stages finish early if the caller stopped or failed part way
+        stopped.set()
+        for stage in stages:
+            stage.join()
+
+
+def put_into_queue(
+    produce: Callable[[], Iterable[T]],
+    batch_size: int,
+    output: queue.Queue,
+    stopped: threading.Event,
+) -> None:
+    """Runs a stage, putting what it produces into the output queue in batches
+    followed by end_of_queue. If it raises, the exception is put into the queue
+    instead to be raised by whichever stage reads from it.
+    """
+    try:
+        items = iter(produce())
+        while batch := list(islice(items, batch_size)):
+            if not put_or_stop(output, batch, stopped):
+                return
+    except Exception as exception:
+        put_or_stop(output, exception, stopped)
+        return
+
+    put_or_stop(output, end_of_queue, stopped)
+
+
+def put_or_stop(output: queue.Queue, item: object, stopped: threading.Event) -> bool:
+    """Waits for space in the queue to put the item in, unless the pipeline is
+    stopped first. Returns whether the item was put into the queue.
+    """
+    while not stopped.is_set():
+        try:
+            output.put(item, timeout=POLL_INTERVAL)
+            return True
+        except queue.Full:
+            continue
+
+    return False
+
+
+def iter_batches_from_queue(
+    source: queue.Queue, stopped: threading.Event
+) -> Iterator[list[T]]:
+    """Yields batches from a queue until end_of_queue, raising any exception
+    that the stage putting into it raised.
+    """
+    while not stopped.is_set():
+        try:
+            item = source.get(timeout=POLL_INTERVAL)
+        except queue.Empty:
+            continue
+
+        if item is end_of_queue:
+            return
+        if isinstance(item, Exception):
+            raise item
+        yield item
+
+
+def iter_from_queue(source: queue.Queue, stopped: threading.Event) -> Iterator[T]:
+    for batch in iter_batches_from_queue(source, stopped):
+        yield from batch
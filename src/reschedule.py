@@ -1,43 +1,353 @@
+from bisect import bisect_left
 from datetime import datetime, timedelta
-from operator import itemgetter
-from calendar_event import CalendarEvent
+import heapq
+from itertools import chain
+from typing import Iterable, Iterator, Literal, Optional
+from calendar_event import CalendarEvent, get_duration, get_priority
+from memory_budget import MemoryBudget, SpillingHeap, approximate_event_size
+from timeline import ONE_MINUTE, Timeline
 
 
-def adjust_event_schedule(events: list[CalendarEvent]) -> list[CalendarEvent]:
+Backend = Literal["list", "timeline"]
+
+# The events to be rescheduled, keyed on (-priority, start_date, position)
+RescheduleHeap = SpillingHeap[tuple[int, datetime, int, CalendarEvent]]
+
+# The events inside hours still to be checked, keyed on (-priority, position)
+CandidateHeap = SpillingHeap[tuple[int, int, CalendarEvent]]
+
+
+def adjust_event_schedule(
+    events: Iterable[CalendarEvent],
+    backend: Backend = "list",
+    rescheduled_ids: Optional[set[str]] = None,
+) -> list[CalendarEvent]:
     """Filter for all events that validly fit within the time schedule
     (Mon-Fri 09:00-18:00) and don't overlap, and then try to refit all other
     events around these valid ones.
 
+    Overlaps are won by the event with the highest priority (the first
+    encountered for equal priorities), and events are refitted in order of
+    priority and then start date.
+
     Args:
-        events (list[Event]): The events to readjust
+        events (Iterable[Event]): The events to readjust, e.g. a list or a
+        stream of events from iter_events
+        backend (Backend, optional): How to hold the schedule while building
+        it, either "list" (one sorted list) or "timeline" (a Timeline bucketed
+        by day, see adjust_event_schedule_on_timeline). Both give the same
+        result. Defaults to "list".
+        rescheduled_ids (set[str], optional): If given, the ids of the events
+        that had to be rescheduled (rather than keeping their slot) are added
+        to it, for which every event needs an id (see assign_event_ids)
+
+    Raises:
+        ValueError: Raised for an unknown backend
 
     Returns:
         list[Event]: A new list of events that fit within Mon-Fri 09:00-18:00
         and don't overlap
     """
-    # First pass - find all the events that are already valid (prioritising first encountered)
-    valid_events = []
-    to_be_rescheduled = []
-    for event in events:
-        # Check for inside correct hours
-        if not is_inside_hours(event):
-            to_be_rescheduled.append(event)
+    if backend == "timeline":
+        return adjust_event_schedule_on_timeline(events, rescheduled_ids)
+    if backend != "list":
+        raise ValueError(f"Unknown backend {backend}")
+
+    sorted_events, to_be_rescheduled = split_valid_events(events)
+
+    return list(
+        iter_rescheduled_events(sorted_events, to_be_rescheduled, rescheduled_ids)
+    )
+
+
+def adjust_event_schedule_on_timeline(
+    events: Iterable[CalendarEvent], rescheduled_ids: Optional[set[str]] = None
+) -> list[CalendarEvent]:
+    """adjust_event_schedule, but holding the schedule in a Timeline so that
+    overlaps and gaps are found with bit operations on each day's occupied
+    minutes, and days are skipped by how many free minutes they have. Events
+    are also inserted into their day rather than copying the whole schedule.
+
+    A Timeline can't hold empty events or ones longer than a working day, so
+    any calendars with those are scheduled on the list backend instead. That
+    means checking every event first, so they're all read up front.
+    """
+    events = list(events)
+    if not all(Timeline.can_hold(x) for x in events):
+        return adjust_event_schedule(events, "list", rescheduled_ids)
+
+    timeline, to_be_rescheduled = split_valid_events_on_timeline(events)
+    if not len(timeline):
+        # With no valid events the first event is kept where it is, even if
+        # that's outside of hours, so the rest can't be held by a Timeline
+        return list(iter_rescheduled_events([], to_be_rescheduled, rescheduled_ids))
+
+    for *_, event in to_be_rescheduled.pop_all():
+        if rescheduled_ids is not None:
+            rescheduled_ids.add(event["id"])
+        slot_into_timeline(event, timeline)
+
+    return list(timeline)
+
+
+def iter_rescheduled_events(
+    sorted_events: list[CalendarEvent],
+    to_be_rescheduled: RescheduleHeap,
+    rescheduled_ids: Optional[set[str]] = None,
+) -> Iterator[CalendarEvent]:
+    """Slots the events to be rescheduled into the valid events one by one,
+    yielding the events of the final schedule in order as soon as they're
+    known to be final.
+
+    slot_into_schedule only ever inserts an event after all the events that
+    start at or before it, so once every event still to be slotted in starts
+    after some event, nothing can be inserted before that event any more. Only
+    the last of the final events is still needed (as the start of the gap
+    after it), so the rest are dropped once they're yielded, and released from
+    the memory budget of the heap (if any).
+
+    Args:
+        sorted_events (list[Event]): The valid events, sorted by start date
+        to_be_rescheduled (RescheduleHeap): The heap of events to be
+        rescheduled, as returned by split_valid_events
+        rescheduled_ids (set[str], optional): If given, the ids of the events
+        to be rescheduled are added to it as they're slotted in
+
+    Yields:
+        Event: The events of the final schedule, in order
+    """
+    # Events of the same priority are slotted in by start date, so the events
+    # still to be slotted in start no earlier than the next one to be slotted
+    # in, or the earliest start of a lower priority
+    earliest_starts: dict[int, datetime] = {}
+    for negative_priority, start_date, *_ in to_be_rescheduled:
+        if start_date < earliest_starts.get(negative_priority, datetime.max):
+            earliest_starts[negative_priority] = start_date
+
+    earliest_lower_starts: dict[int, datetime] = {}
+    earliest_lower_start = datetime.max
+    for negative_priority in sorted(earliest_starts, reverse=True):
+        earliest_lower_starts[negative_priority] = earliest_lower_start
+        earliest_lower_start = min(
+            earliest_lower_start, earliest_starts[negative_priority]
+        )
+
+    memory_budget = to_be_rescheduled.memory_budget
+    pending = to_be_rescheduled.pop_all()
+    next_pending = next(pending, None)
+    final_count = 0
+    while next_pending is not None:
+        *_, event = next_pending
+        if rescheduled_ids is not None:
+            rescheduled_ids.add(event["id"])
+        sorted_events = slot_into_schedule(event, sorted_events)
+        next_pending = next(pending, None)
+        if next_pending is None:
+            break
+
+        negative_priority, start_date, *_ = next_pending
+        earliest_pending_start = min(
+            start_date, earliest_lower_starts[negative_priority]
+        )
+        while (
+            final_count < len(sorted_events)
+            and sorted_events[final_count]["start_date"] <= earliest_pending_start
+        ):
+            yield sorted_events[final_count]
+            if memory_budget is not None:
+                memory_budget.release(
+                    approximate_event_size(sorted_events[final_count])
+                )
+            final_count += 1
+
+        if final_count > 1:
+            sorted_events = sorted_events[final_count - 1 :]
+            final_count = 1
+
+    yield from sorted_events[final_count:]
+
+
+def split_valid_events(
+    events: Iterable[CalendarEvent], memory_budget: Optional[MemoryBudget] = None
+) -> tuple[list[CalendarEvent], RescheduleHeap]:
+    """Finds all the events that are already valid, i.e. inside hours and not
+    overlapping any event of a higher priority (or an earlier event of the same
+    priority).
+
+    Candidates of equal priority are checked in input order, so while every
+    candidate has the same priority (e.g. none are given one) they're checked
+    as they stream in, and those that overlap go straight into the heap of
+    events to be rescheduled. Once a candidate of another priority turns up,
+    the rest are checked once all events have been read, highest priority
+    first (see split_valid_events_by_priority).
+
+    Args:
+        events (Iterable[Event]): The events to split, which are only iterated
+        over once so can be streamed in
+        memory_budget (MemoryBudget, optional): A budget to reserve the events
+        against, beyond which the events to be rescheduled (and the candidates
+        still to be checked, if any) are spilled to disk. Spilled events are
+        read back as copies, so this only saves memory if nothing else holds on
+        to the events, e.g. when they're streamed in from iter_events.
+
+    Returns:
+        tuple[list[Event], RescheduleHeap]: The valid events sorted by start
+        date, and a heap of the events to be rescheduled keyed on
+        (-priority, start_date, position)
+    """
+    events = iter(events)
+    valid_events: list[CalendarEvent] = []
+    valid_keys: list[tuple[datetime, datetime, int]] = []
+    to_be_rescheduled: RescheduleHeap = SpillingHeap(memory_budget)
+    streamed_priority = None
+    for index, event in enumerate(events):
+        negative_priority = -get_priority(event)
+        is_candidate = is_inside_hours(event)
+        if is_candidate and streamed_priority not in (None, negative_priority):
+            return split_valid_events_by_priority(
+                chain([(index, event)], enumerate(events, start=index + 1)),
+                valid_events,
+                valid_keys,
+                to_be_rescheduled,
+                memory_budget,
+            )
+
+        if memory_budget is not None:
+            memory_budget.reserve(approximate_event_size(event))
+        if not is_candidate:
+            to_be_rescheduled.push(
+                (negative_priority, event["start_date"], index, event)
+            )
             continue
 
-        # Check for overlaps
-        is_overlapping = any(x for x in valid_events if does_events_overlap(x, event))
-        if is_overlapping:
-            to_be_rescheduled.append(event)
+        streamed_priority = negative_priority
+        if not insert_if_valid(event, index, valid_events, valid_keys):
+            to_be_rescheduled.push(
+                (negative_priority, event["start_date"], index, event)
+            )
+
+    return valid_events, to_be_rescheduled
+
+
+def split_valid_events_by_priority(
+    events: Iterable[tuple[int, CalendarEvent]],
+    valid_events: list[CalendarEvent],
+    valid_keys: list[tuple[datetime, datetime, int]],
+    to_be_rescheduled: RescheduleHeap,
+    memory_budget: Optional[MemoryBudget] = None,
+) -> tuple[list[CalendarEvent], RescheduleHeap]:
+    """The rest of split_valid_events once candidates of different priorities
+    turn up. The events split so far are put back into a heap of candidates
+    along with the remaining (position, event) pairs, which are then checked
+    once all events have been read, highest priority first.
+
+    The candidates are held in a SpillingHeap against the same memory budget,
+    so they can be spilled to disk while the rest are read.
+    """
+    candidates: CandidateHeap = SpillingHeap(memory_budget)
+    for (*_, index), event in zip(valid_keys, valid_events):
+        candidates.push((-get_priority(event), index, event))
+    # Drop the streamed valid events so that any of them that get spilled are
+    # only held on disk
+    valid_events.clear()
+    valid_keys.clear()
+
+    remaining_to_be_rescheduled: RescheduleHeap = SpillingHeap(memory_budget)
+    for negative_priority, start_date, index, event in to_be_rescheduled.pop_all():
+        if is_inside_hours(event):
+            candidates.push((negative_priority, index, event))
+        else:
+            remaining_to_be_rescheduled.push(
+                (negative_priority, start_date, index, event)
+            )
+
+    for index, event in events:
+        if memory_budget is not None:
+            memory_budget.reserve(approximate_event_size(event))
+
+        if is_inside_hours(event):
+            candidates.push((-get_priority(event), index, event))
         else:
-            valid_events.append(event)
+            remaining_to_be_rescheduled.push(
+                (-get_priority(event), event["start_date"], index, event)
+            )
 
-    # Sort the events and then find where we can slot them in one by one
-    sorted_events = sorted(valid_events, key=itemgetter("start_date"))
-    to_be_rescheduled = sorted(to_be_rescheduled, key=itemgetter("start_date"))
-    for event in to_be_rescheduled:
-        sorted_events = slot_into_schedule(event, sorted_events)
+    sorted_events: list[CalendarEvent] = []
+    sorted_keys: list[tuple[datetime, datetime, int]] = []
+    for negative_priority, index, event in candidates.pop_all():
+        if not insert_if_valid(event, index, sorted_events, sorted_keys):
+            remaining_to_be_rescheduled.push(
+                (negative_priority, event["start_date"], index, event)
+            )
+
+    return sorted_events, remaining_to_be_rescheduled
+
+
+def insert_if_valid(
+    event: CalendarEvent,
+    index: int,
+    valid_events: list[CalendarEvent],
+    valid_keys: list[tuple[datetime, datetime, int]],
+) -> bool:
+    """Inserts an event inside hours into the valid events (and their start
+    dates, end dates and positions in the input) unless it overlaps any of
+    them. Returns whether it was inserted.
+    """
+    # Accepted events never overlap, so both their start and end dates are in
+    # ascending order and only the neighbours of a candidate need checking
+    position = bisect_left(valid_keys, (event["start_date"], event["end_date"]))
+    is_overlapping = any(
+        does_events_overlap(x, event)
+        for x in valid_events[max(position - 1, 0) : position + 1]
+    )
+    if is_overlapping:
+        return False
 
-    return sorted_events
+    valid_keys.insert(position, (event["start_date"], event["end_date"], index))
+    valid_events.insert(position, event)
+    return True
+
+
+def split_valid_events_on_timeline(
+    events: Iterable[CalendarEvent],
+) -> tuple[Timeline, RescheduleHeap]:
+    """split_valid_events, but adding the valid events to a Timeline. All the
+    events must be able to be held by a Timeline.
+    """
+    candidates, to_be_rescheduled = build_priority_heaps(events)
+
+    timeline = Timeline()
+    while candidates:
+        negative_priority, index, event = heapq.heappop(candidates)
+        if timeline.overlaps(event):
+            to_be_rescheduled.push(
+                (negative_priority, event["start_date"], index, event)
+            )
+        else:
+            timeline.add(event)
+
+    return timeline, to_be_rescheduled
+
+
+def build_priority_heaps(
+    events: Iterable[CalendarEvent],
+) -> tuple[list[tuple[int, int, CalendarEvent]], RescheduleHeap]:
+    """Splits events into a heap of those inside hours, to be popped highest
+    priority first (keeping input order for equal ones), and a heap of those
+    that need rescheduling keyed on (-priority, start_date, position).
+    """
+    candidates = []
+    to_be_rescheduled: RescheduleHeap = SpillingHeap()
+    for index, event in enumerate(events):
+        if is_inside_hours(event):
+            candidates.append((-get_priority(event), index, event))
+        else:
+            to_be_rescheduled.push(
+                (-get_priority(event), event["start_date"], index, event)
+            )
+    heapq.heapify(candidates)
+
+    return candidates, to_be_rescheduled
 
 
 def slot_into_schedule(
@@ -58,97 +368,167 @@ def slot_into_schedule(
         list[Event]: A new schedule of events with the event slotted in.
     """
     if not valid_events:
-        return [event]
+        # Nothing to fit around, so it keeps its times
+        return [{**event}]
 
-    event_duration = event["end_date"] - event["start_date"]
+    event_duration = get_duration(event)
 
     for index, valid_event in enumerate(valid_events):
-        previous_event = valid_events[index - 1] if index > 0 else None
         if (
             event["start_date"] >= valid_event["start_date"]
             or event["start_date"] >= valid_event["end_date"]
         ):
             continue
 
-        if not previous_event:
-            start_of_day = valid_event["start_date"].replace(hour=9, minute=0)
-            slot_duration = valid_event["start_date"] - start_of_day
-            if event_duration > slot_duration:
-                # Can't fit into this slot, move onto next
-                continue
-
-            new_event: CalendarEvent = {
-                "start_date": valid_event["start_date"] - event_duration,
-                "end_date": valid_event["start_date"],
-                "name": event["name"],
-            }
-            return [new_event] + valid_events
-
-        # valid_event is after our event, so try scheduling it in between
-        # previous_event and valid_event
-        end_of_day = previous_event["end_date"].replace(hour=18, minute=0)
-        if end_of_day > valid_event["start_date"]:
-            # previous and next events are on the same day, so check the slot between these
-            slot_duration = valid_event["start_date"] - previous_event["end_date"]
-            if event_duration > slot_duration:
-                continue
-
-            slot_start = previous_event["end_date"]
-
+        if index == 0:
+            slot_start = find_slot_before(event_duration, valid_event)
         else:
-            # The next event is on the next day, so there's 3 potential slots:
-            #  - Up to the end of day 1 (just after previous event)
-            day_1_slot_duration = end_of_day - previous_event["end_date"]
-
-            #  - At the start of day 2 (just before next event)
-            start_of_day_2 = valid_event["start_date"].replace(hour=9, minute=0)
-            day_2_slot_duration = valid_event["start_date"] - start_of_day_2
-
-            #  - Any free days that occur between day 1 and day 2
-            days_between = find_days_between_dates(
-                previous_event["end_date"], valid_event["start_date"]
+            # valid_event is after our event, so try scheduling it in between
+            # previous_event and valid_event
+            slot_start = find_slot_between(
+                event_duration, valid_events[index - 1], valid_event
             )
-
-            if event_duration <= day_1_slot_duration:
-                slot_start = previous_event["end_date"]
-            elif days_between:
-                # We have some free days in between, so just pick the first day
-                slot_start = days_between[0].replace(hour=9, minute=0)
-            elif event_duration <= day_2_slot_duration:
-                slot_start = start_of_day_2
-            else:
-                # Can't fit into either slot, so move on
-                continue
+        if slot_start is None:
+            # Can't fit into this slot, move onto next
+            continue
 
         # Found a slot, so fit the event in
         new_event: CalendarEvent = {
+            **event,
             "start_date": slot_start,
             "end_date": slot_start + event_duration,
-            "name": event["name"],
         }
         all_previous = valid_events[0:index]
         all_next = valid_events[index:]
         return all_previous + [new_event] + all_next
 
     # Fit our event after all the others
-    last_valid_event = valid_events[-1]
-    end_of_day = last_valid_event["end_date"].replace(hour=18, minute=0)
-    slot_duration = end_of_day - last_valid_event["end_date"]
+    next_start = find_slot_after(event_duration, valid_events[-1])
+    new_event: CalendarEvent = {
+        **event,
+        "start_date": next_start,
+        "end_date": next_start + event_duration,
+    }
+    return valid_events + [new_event]
+
 
-    last_event_time = last_valid_event["end_date"]
-    next_start = last_valid_event["end_date"]
+def slot_into_timeline(event: CalendarEvent, timeline: Timeline) -> None:
+    """slot_into_schedule, but adding the event into a Timeline with at least
+    one event in it. Rather than checking every gap after the event's start,
+    each day's gaps are only checked if the day has enough free minutes, and
+    then with bit operations on its occupied minutes.
+    """
+    event_duration = get_duration(event)
+    position, index = timeline.find_first_after(event["start_date"])
+    slot_start = None
+    while slot_start is None and position < timeline.day_count:
+        bucket = timeline.bucket_at(position)
+        if index == 0:
+            # The gap from the previous day with events (if any) to this one
+            if position == 0:
+                slot_start = find_slot_before(event_duration, bucket.events[0])
+            else:
+                previous_bucket = timeline.bucket_at(position - 1)
+                slot_start = find_slot_between(
+                    event_duration, previous_bucket.events[-1], bucket.events[0]
+                )
+            index = 1
+
+        if slot_start is None:
+            # The gaps between the events of this day
+            gap_index = bucket.find_gap(index, event_duration // ONE_MINUTE)
+            if gap_index is not None:
+                slot_start = bucket.events[gap_index - 1]["end_date"]
+
+        position += 1
+        index = 0
+
+    if slot_start is None:
+        last_event = timeline.bucket_at(timeline.day_count - 1).events[-1]
+        slot_start = find_slot_after(event_duration, last_event)
+
+    timeline.add(
+        {
+            **event,
+            "start_date": slot_start,
+            "end_date": slot_start + event_duration,
+        }
+    )
+
+
+def find_slot_before(
+    event_duration: timedelta, next_event: CalendarEvent
+) -> Optional[datetime]:
+    """Finds where an event could start to fit in just before the first event of
+    a schedule, on the same day. Returns None if it doesn't fit.
+    """
+    start_of_day = next_event["start_date"].replace(hour=9, minute=0)
+    slot_duration = next_event["start_date"] - start_of_day
+    if event_duration > slot_duration:
+        return None
+
+    return next_event["start_date"] - event_duration
+
+
+def find_slot_between(
+    event_duration: timedelta,
+    previous_event: CalendarEvent,
+    next_event: CalendarEvent,
+) -> Optional[datetime]:
+    """Finds where an event could start to fit in between two consecutive events
+    of a schedule. Returns None if it doesn't fit.
+    """
+    end_of_day = previous_event["end_date"].replace(hour=18, minute=0)
+    if end_of_day > next_event["start_date"]:
+        # previous and next events are on the same day, so check the slot between these
+        slot_duration = next_event["start_date"] - previous_event["end_date"]
+        if event_duration > slot_duration:
+            return None
+
+        return previous_event["end_date"]
+
+    # The next event is on the next day, so there's 3 potential slots:
+    #  - Up to the end of day 1 (just after previous event)
+    day_1_slot_duration = end_of_day - previous_event["end_date"]
+
+    #  - At the start of day 2 (just before next event)
+    start_of_day_2 = next_event["start_date"].replace(hour=9, minute=0)
+    day_2_slot_duration = next_event["start_date"] - start_of_day_2
+
+    #  - Any free days that occur between day 1 and day 2
+    days_between = find_days_between_dates(
+        previous_event["end_date"], next_event["start_date"]
+    )
+
+    if event_duration <= day_1_slot_duration:
+        return previous_event["end_date"]
+    elif days_between:
+        # We have some free days in between, so just pick the first day
+        return days_between[0].replace(hour=9, minute=0)
+    elif event_duration <= day_2_slot_duration:
+        return start_of_day_2
+    else:
+        # Can't fit into either slot
+        return None
+
+
+def find_slot_after(event_duration: timedelta, last_event: CalendarEvent) -> datetime:
+    """Finds where an event should start to fit in after the last event of a
+    schedule, either later that day or on the next weekday.
+    """
+    end_of_day = last_event["end_date"].replace(hour=18, minute=0)
+    slot_duration = end_of_day - last_event["end_date"]
+
+    last_event_time = last_event["end_date"]
+    next_start = last_event["end_date"]
     if slot_duration < event_duration:
         # Can't fit on same day, so fit on next week if Friday, else next day
         days_to_increment = 3 if last_event_time.isoweekday() == 5 else 1
         next_start = next_start.replace(hour=9, minute=0) + timedelta(
             days=days_to_increment
         )
-    new_event: CalendarEvent = {
-        "start_date": next_start,
-        "end_date": next_start + event_duration,
-        "name": event["name"],
-    }
-    return valid_events + [new_event]
+
+    return next_start
 
 
 def is_inside_hours(event: CalendarEvent) -> bool:
@@ -0,0 +1,87 @@
+from collections import Counter
+from datetime import datetime
+from hashlib import sha1
+from typing import Iterable, Iterator, TypedDict
+
+from calendar_event import CalendarEvent
+from event_parser import date_format_str
+
+
+class EventChange(TypedDict):
+    id: str
+    name: str
+    original_start_date: datetime
+    original_end_date: datetime
+    start_date: datetime
+    end_date: datetime
+    # Whether adjust_event_schedule rescheduled the event rather than keeping it,
+    # even if it ended up with the same times
+    rescheduled: bool
+
+
+def assign_event_ids(events: list[CalendarEvent]) -> list[CalendarEvent]:
+    """Gives every event a stable id derived from its original times and name,
+    so the same input always produces the same ids regardless of line order.
+    Identical events are told apart by how many times they've occurred before.
+    The full digest is kept so that ids don't collide.
+
+    Args:
+        events (list[Event]): The events to identify
+
+    Returns:
+        list[Event]: New Event dicts with an id set
+    """
+    occurrences: Counter[str] = Counter()
+    identified_events = []
+    for event in events:
+        key = "|".join(
+            [
+                event["start_date"].strftime(date_format_str),
+                event["end_date"].strftime(date_format_str),
+                event["name"],
+            ]
+        )
+        digest = sha1(f"{key}|{occurrences[key]}".encode()).hexdigest()
+        occurrences[key] += 1
+        identified_events.append({**event, "id": digest})
+
+    return identified_events
+
+
+def track_schedule_changes(
+    events: list[CalendarEvent],
+    scheduled_events: Iterable[CalendarEvent],
+    rescheduled_ids: set[str],
+) -> Iterator[EventChange]:
+    """Pairs each scheduled event up with the original event it came from and
+    records whether adjust_event_schedule kept or rescheduled it.
+
+    Args:
+        events (list[Event]): The original events, with ids assigned
+        scheduled_events (Iterable[Event]): The output of adjust_event_schedule
+        for those events
+        rescheduled_ids (set[str]): The ids adjust_event_schedule recorded as
+        rescheduled
+
+    Raises:
+        ValueError: Raised if two original events have the same id
+        KeyError: Raised if a scheduled event has no matching original event
+
+    Yields:
+        EventChange: The change of each scheduled event, in schedule order
+    """
+    originals = {event["id"]: event for event in events}
+    if len(originals) != len(events):
+        raise ValueError("Event ids must be unique")
+
+    for event in scheduled_events:
+        original = originals[event["id"]]
+        yield {
+            "id": event["id"],
+            "name": event["name"],
+            "original_start_date": original["start_date"],
+            "original_end_date": original["end_date"],
+            "start_date": event["start_date"],
+            "end_date": event["end_date"],
+            "rescheduled": event["id"] in rescheduled_ids,
+        }
@@ -0,0 +1,317 @@
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from operator import itemgetter
+from typing import Optional, Sequence
+
+from calendar_event import CalendarEvent
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+WORKING_DAY = timedelta(hours=9)
+
+# Stands in for the length of gaps with no working time at all
+NO_WORKING_TIME = timedelta.min
+ONE_MICROSECOND = timedelta(microseconds=1)
+
+
+class ScheduleIndex:
+    """A read-only index over a finished schedule (e.g. the output of
+    adjust_event_schedule) for answering free/busy questions in O(log n).
+
+    Events are treated as half-open intervals [start_date, end_date), so an
+    event ending at 10:00 doesn't make someone busy at 10:00. Free slots are
+    only ever found within Mon-Fri 09:00-18:00.
+
+    Batch queries use numpy if it's installed, and fall back to running the
+    single queries one by one otherwise.
+    """
+
+    def __init__(self, events: list[CalendarEvent]):
+        self._events = tuple(sorted(events, key=itemgetter("start_date")))
+        self._starts = [x["start_date"] for x in self._events]
+
+        # The latest end of each event and all events before it, so that the
+        # first event ending after a date can be found with a binary search
+        self._latest_ends = []
+        for event in self._events:
+            latest_end = self._latest_ends[-1] if self._latest_ends else None
+            if latest_end is None or event["end_date"] > latest_end:
+                latest_end = event["end_date"]
+            self._latest_ends.append(latest_end)
+
+        # The busy intervals of the schedule, with any overlapping or touching
+        # events merged so that everything between them is free
+        self._busy_starts: list[datetime] = []
+        self._busy_ends: list[datetime] = []
+        for event in self._events:
+            if event["start_date"] >= event["end_date"]:
+                continue
+            if self._busy_ends and event["start_date"] <= self._busy_ends[-1]:
+                self._busy_ends[-1] = max(self._busy_ends[-1], event["end_date"])
+            else:
+                self._busy_starts.append(event["start_date"])
+                self._busy_ends.append(event["end_date"])
+
+        # Gap i is the free time between busy intervals i - 1 and i, with the
+        # first and last gaps being unbounded
+        longest_runs = (
+            [WORKING_DAY]
+            + [
+                find_longest_working_run(start, end)
+                for start, end in zip(self._busy_ends, self._busy_starts[1:])
+            ]
+            + [WORKING_DAY]
+        )
+        self._free_gaps = FreeGapIndex(longest_runs)
+
+        if numpy is not None:
+            self._busy_starts_array = numpy.array(
+                self._busy_starts, dtype="datetime64[us]"
+            )
+            self._busy_ends_array = numpy.array(self._busy_ends, dtype="datetime64[us]")
+            # NO_WORKING_TIME doesn't fit into a timedelta64, but any negative
+            # length is shorter than every slot
+            self._longest_runs_array = numpy.array(
+                [max(x, -ONE_MICROSECOND) for x in longest_runs],
+                dtype="timedelta64[us]",
+            )
+
+    @property
+    def events(self) -> tuple[CalendarEvent, ...]:
+        return self._events
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def is_free(self, start_date: datetime, end_date: datetime) -> bool:
+        """Whether no events overlap start_date to end_date"""
+        # Only the last busy interval starting before end_date can overlap
+        index = bisect_left(self._busy_starts, end_date) - 1
+        return index < 0 or self._busy_ends[index] <= start_date
+
+    def events_between(
+        self, start_date: datetime, end_date: datetime
+    ) -> list[CalendarEvent]:
+        """All events overlapping start_date to end_date, in order"""
+        first_index = bisect_left(self._latest_ends, start_date)
+        last_index = bisect_left(self._starts, end_date)
+        return [
+            event
+            for event in self._events[first_index:last_index]
+            if event["end_date"] > start_date
+            or start_date <= event["start_date"] == event["end_date"]
+        ]
+
+    def next_free_slot(
+        self, after: datetime, duration: timedelta
+    ) -> Optional[datetime]:
+        """Finds the earliest start, at or after a date, of a free slot of the
+        given duration within Mon-Fri 09:00-18:00.
+
+        Args:
+            after (datetime): The earliest the slot can start
+            duration (timedelta): How long the slot must be
+
+        Raises:
+            ValueError: Raised if the duration isn't positive
+
+        Returns:
+            Optional[datetime]: The start of the slot, or None if the duration
+            is longer than a working day so could never fit
+        """
+        if duration <= timedelta():
+            raise ValueError("Duration must be positive")
+        if duration > WORKING_DAY:
+            return None
+
+        # Start with the gap that after is in (or that follows the busy
+        # interval it's in)
+        gap_index = bisect_right(self._busy_starts, after)
+        gap_start = self._busy_ends[gap_index - 1] if gap_index > 0 else after
+        gap_end = (
+            self._busy_starts[gap_index] if gap_index < len(self._busy_starts) else None
+        )
+        slot_start = find_earliest_fit(max(gap_start, after), gap_end, duration)
+        if slot_start:
+            return slot_start
+
+        # Then skip straight to the first later gap that's long enough
+        gap_index = self._free_gaps.find_first_at_least(gap_index + 1, duration)
+        gap_start = self._busy_ends[gap_index - 1]
+        gap_end = (
+            self._busy_starts[gap_index] if gap_index < len(self._busy_starts) else None
+        )
+        return find_earliest_fit(gap_start, gap_end, duration)
+
+    def are_free(
+        self, start_dates: Sequence[datetime], end_dates: Sequence[datetime]
+    ) -> list[bool]:
+        """is_free for many periods at once"""
+        if numpy is None:
+            return [self.is_free(x, y) for x, y in zip(start_dates, end_dates)]
+
+        if not self._busy_starts:
+            return [True] * len(start_dates)
+
+        starts = numpy.array(start_dates, dtype="datetime64[us]")
+        ends = numpy.array(end_dates, dtype="datetime64[us]")
+        indexes = numpy.searchsorted(self._busy_starts_array, ends, side="left") - 1
+        overlapping_ends = self._busy_ends_array[numpy.maximum(indexes, 0)]
+        return ((indexes < 0) | (overlapping_ends <= starts)).tolist()
+
+    def next_free_slots(
+        self, afters: Sequence[datetime], duration: timedelta
+    ) -> list[Optional[datetime]]:
+        """next_free_slot for many dates at once"""
+        if numpy is None:
+            return [self.next_free_slot(x, duration) for x in afters]
+
+        if duration <= timedelta():
+            raise ValueError("Duration must be positive")
+        if duration > WORKING_DAY:
+            return [None] * len(afters)
+
+        after_array = numpy.array(afters, dtype="datetime64[us]")
+        step = numpy.timedelta64(duration, "us")
+        if not self._busy_starts:
+            slot_starts, _ = find_earliest_fits(after_array, None, step)
+            return slot_starts.tolist()
+
+        # Start with the gap that each date is in, as in next_free_slot
+        gap_indexes = numpy.searchsorted(self._busy_starts_array, after_array, "right")
+        gap_starts = numpy.where(
+            gap_indexes > 0,
+            numpy.maximum(self._busy_ends_array[gap_indexes - 1], after_array),
+            after_array,
+        )
+        slot_starts, fits = find_earliest_fits(
+            gap_starts, self._gap_ends_of(gap_indexes), step
+        )
+
+        # Then the first later gap that's long enough, found by searching the
+        # long enough gaps (of which the last, unbounded, gap is always one)
+        long_enough_gaps = numpy.flatnonzero(self._longest_runs_array >= step)
+        later_gap_indexes = long_enough_gaps[
+            numpy.minimum(
+                numpy.searchsorted(long_enough_gaps, gap_indexes + 1),
+                len(long_enough_gaps) - 1,
+            )
+        ]
+        later_slot_starts, _ = find_earliest_fits(
+            self._busy_ends_array[later_gap_indexes - 1],
+            self._gap_ends_of(later_gap_indexes),
+            step,
+        )
+
+        return numpy.where(fits, slot_starts, later_slot_starts).tolist()
+
+    def _gap_ends_of(self, gap_indexes):
+        """The end of each gap, or NaT for the last (unbounded) gap"""
+        busy_count = len(self._busy_starts)
+        return numpy.where(
+            gap_indexes < busy_count,
+            self._busy_starts_array[numpy.minimum(gap_indexes, busy_count - 1)],
+            numpy.datetime64("NaT"),
+        )
+
+
+class FreeGapIndex:
+    """A max segment tree over the longest working run of each free gap, to find
+    the first gap from some point on that a slot could fit into in O(log n).
+    """
+
+    def __init__(self, longest_runs: list[timedelta]):
+        self._size = 1
+        while self._size < len(longest_runs):
+            self._size *= 2
+
+        self._tree = [NO_WORKING_TIME] * (2 * self._size)
+        self._tree[self._size : self._size + len(longest_runs)] = longest_runs
+        for index in range(self._size - 1, 0, -1):
+            self._tree[index] = max(self._tree[2 * index], self._tree[2 * index + 1])
+
+    def find_first_at_least(self, start_index: int, duration: timedelta) -> int:
+        """The index of the first gap at or after start_index whose longest run
+        is at least duration. The last gap is unbounded, so there always is one.
+        """
+        # Walk up from start_index, checking the right hand subtrees that
+        # haven't been passed yet, until one is long enough
+        index = start_index + self._size
+        while self._tree[index] < duration:
+            while index % 2 == 1:
+                index //= 2
+            index += 1
+
+        # Then walk down to the first long enough gap within it
+        while index < self._size:
+            index *= 2
+            if self._tree[index] < duration:
+                index += 1
+
+        return index - self._size
+
+
+def find_longest_working_run(start_date: datetime, end_date: datetime) -> timedelta:
+    """The longest stretch of Mon-Fri 09:00-18:00 between two dates, or
+    NO_WORKING_TIME if there isn't any working time between them at all.
+    """
+    longest_run = NO_WORKING_TIME
+    day = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+    while day <= end_date and longest_run < WORKING_DAY:
+        if day.isoweekday() not in [6, 7]:
+            run = min(end_date, day.replace(hour=18)) - max(
+                start_date, day.replace(hour=9)
+            )
+            longest_run = max(longest_run, run)
+        day += timedelta(days=1)
+
+    return longest_run
+
+
+def find_earliest_fit(
+    start_date: datetime, end_date: Optional[datetime], duration: timedelta
+) -> Optional[datetime]:
+    """The earliest start of a slot of duration within Mon-Fri 09:00-18:00, at or
+    after start_date and ending by end_date (None for no limit). duration must
+    be no longer than a working day.
+    """
+    day = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+    slot_start = max(start_date, day.replace(hour=9))
+    if day.isoweekday() in [6, 7] or slot_start + duration > day.replace(hour=18):
+        day += timedelta(days=1)
+        while day.isoweekday() in [6, 7]:
+            day += timedelta(days=1)
+        slot_start = day.replace(hour=9)
+
+    if end_date is not None and slot_start + duration > end_date:
+        return None
+
+    return slot_start
+
+
+def find_earliest_fits(start_dates, end_dates, duration):
+    """find_earliest_fit for numpy arrays of datetime64[us] start and end dates
+    (NaT for no limit, or None for no limits at all) and a timedelta64[us]
+    duration.
+
+    Returns:
+        The earliest start of each slot, and whether each fits by its end date
+    """
+    days = start_dates.astype("datetime64[D]")
+    start_of_days = days.astype("datetime64[us]") + numpy.timedelta64(9, "h")
+    end_of_days = days.astype("datetime64[us]") + numpy.timedelta64(18, "h")
+    next_start_of_days = numpy.busday_offset(days + 1, 0, roll="forward").astype(
+        "datetime64[us]"
+    ) + numpy.timedelta64(9, "h")
+
+    slot_starts = numpy.maximum(start_dates, start_of_days)
+    is_moved = ~numpy.is_busday(days) | (slot_starts + duration > end_of_days)
+    slot_starts = numpy.where(is_moved, next_start_of_days, slot_starts)
+    if end_dates is None:
+        return slot_starts, numpy.ones(len(slot_starts), dtype=bool)
+
+    return slot_starts, numpy.isnat(end_dates) | (slot_starts + duration <= end_dates)
@@ -0,0 +1,176 @@
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta
+import sys
+from typing import Iterator, Optional
+
+from calendar_event import CalendarEvent, get_duration
+
+
+WORKING_MINUTES = 9 * 60
+ONE_MINUTE = timedelta(minutes=1)
+
+
+class DayBucket:
+    """The events of a single business day, along with a bitmap of the minutes
+    from 09:00 to 18:00 that they occupy (bit 0 being 09:00-09:01).
+    """
+
+    def __init__(self, day: datetime):
+        self.start_of_day = day.replace(hour=9, minute=0, second=0, microsecond=0)
+        self.events: list[CalendarEvent] = []
+        self.start_minutes: list[int] = []
+        self.end_minutes: list[int] = []
+        self.busy = 0
+        self.free_minutes = WORKING_MINUTES
+
+    def minute_of(self, date: datetime) -> int:
+        """Minutes from 09:00 of this day to a date, rounded down"""
+        return (date - self.start_of_day) // ONE_MINUTE
+
+    def mask_of(self, start_minute: int, end_minute: int) -> int:
+        return (1 << end_minute) - (1 << start_minute)
+
+    def add(self, event: CalendarEvent) -> None:
+        start_minute = self.minute_of(event["start_date"])
+        end_minute = self.minute_of(event["end_date"])
+        index = bisect_left(self.start_minutes, start_minute)
+        self.events.insert(index, event)
+        self.start_minutes.insert(index, start_minute)
+        insort(self.end_minutes, end_minute)
+        self.busy |= self.mask_of(start_minute, end_minute)
+        self.free_minutes -= end_minute - start_minute
+
+    def overlaps(self, event: CalendarEvent) -> bool:
+        start_minute = self.minute_of(event["start_date"])
+        end_minute = self.minute_of(event["end_date"])
+        return bool(self.busy & self.mask_of(start_minute, end_minute))
+
+    def find_gap(self, from_index: int, minutes: int) -> Optional[int]:
+        """Finds the first gap between two of the day's events, at or after the
+        one before events[from_index], that is at least some minutes long.
+
+        Args:
+            from_index (int): The index of the event after the first gap to
+            check, at least 1
+            minutes (int): How long the gap must be
+
+        Returns:
+            Optional[int]: The index of the event after the gap, or None if
+            none are long enough
+        """
+        if self.free_minutes < minutes or from_index >= len(self.events):
+            return None
+
+        # Set the bits that start a run of at least `minutes` free minutes, by
+        # repeatedly and-ing the free bits with themselves shifted along
+        fits = ~self.busy & self.mask_of(0, WORKING_MINUTES)
+        checked_minutes = 1
+        while checked_minutes < minutes:
+            shift = min(checked_minutes, minutes - checked_minutes)
+            fits &= fits >> shift
+            checked_minutes += shift
+
+        # Only runs starting from the gap before events[from_index] up to the
+        # start of the last event are between two events
+        fits &= self.mask_of(self.end_minutes[from_index - 1], self.start_minutes[-1])
+        if not fits:
+            return None
+
+        # The first run starts where the event before the gap ends
+        gap_start_minute = (fits & -fits).bit_length() - 1
+        return bisect_left(self.end_minutes, gap_start_minute) + 1
+
+
+class Timeline:
+    """A schedule of events bucketed by business day, for answering whether an
+    event overlaps the schedule or fits into a day with bit operations rather
+    than comparing it against every event.
+
+    It can only hold events that fit within a single day's 09:00-18:00, are
+    whole minutes, and aren't empty (see can_hold).
+    """
+
+    def __init__(self) -> None:
+        self._days: list[int] = []
+        self._buckets: dict[int, DayBucket] = {}
+        self._event_count = 0
+
+    def __len__(self) -> int:
+        return self._event_count
+
+    def __iter__(self) -> Iterator[CalendarEvent]:
+        for day in self._days:
+            yield from self._buckets[day].events
+
+    @staticmethod
+    def can_hold(event: CalendarEvent) -> bool:
+        """Whether the event (and any rescheduled version of it) would fit into
+        a single day's bucket. Only whether it's inside hours is left to check.
+        """
+        max_duration = timedelta(minutes=WORKING_MINUTES)
+        return (
+            timedelta() < event["end_date"] - event["start_date"] <= max_duration
+            and timedelta() < get_duration(event) <= max_duration
+            and get_duration(event) % ONE_MINUTE == timedelta()
+            and event["start_date"].second == 0
+            and event["start_date"].microsecond == 0
+            and event["end_date"].second == 0
+            and event["end_date"].microsecond == 0
+        )
+
+    def add(self, event: CalendarEvent) -> None:
+        """Adds an event, which must be inside hours and able to be held"""
+        day = event["start_date"].toordinal()
+        if day not in self._buckets:
+            insort(self._days, day)
+            self._buckets[day] = DayBucket(event["start_date"])
+        self._buckets[day].add(event)
+        self._event_count += 1
+
+    def overlaps(self, event: CalendarEvent) -> bool:
+        """Whether an event, which must be inside hours and able to be held,
+        overlaps any events on its day
+        """
+        bucket = self._buckets.get(event["start_date"].toordinal())
+        return bucket is not None and bucket.overlaps(event)
+
+    @property
+    def day_count(self) -> int:
+        return len(self._days)
+
+    def bucket_at(self, position: int) -> DayBucket:
+        """The bucket of the nth day with events on it"""
+        return self._buckets[self._days[position]]
+
+    def find_first_after(self, date: datetime) -> tuple[int, int]:
+        """Finds the first event starting after a date.
+
+        Returns:
+            tuple[int, int]: The position of its day's bucket and its index
+            within that bucket. The position is day_count if there isn't one.
+        """
+        position = bisect_left(self._days, date.toordinal())
+        if position < len(self._days) and self._days[position] == date.toordinal():
+            bucket = self.bucket_at(position)
+            index = bisect_right(bucket.start_minutes, bucket.minute_of(date))
+            if index < len(bucket.events):
+                return position, index
+            position += 1
+
+        return position, 0
+
+    def memory_usage(self) -> int:
+        """The approximate size in bytes of the timeline itself, not counting the
+        events it holds (which are shared with the input).
+        """
+        size = sys.getsizeof(self._days) + sys.getsizeof(self._buckets)
+        size += sum(sys.getsizeof(x) for x in self._days)
+        for bucket in self._buckets.values():
+            size += sys.getsizeof(bucket) + sys.getsizeof(bucket.__dict__)
+            size += sys.getsizeof(bucket.busy) + sys.getsizeof(bucket.start_of_day)
+            size += sys.getsizeof(bucket.events)
+            size += sys.getsizeof(bucket.start_minutes) + sys.getsizeof(
+                bucket.end_minutes
+            )
+
+        return size
@@ -0,0 +1,268 @@
+"""A small differential testing harness. Random cases are generated until a
+time budget runs out, each is run through a reference and a candidate
+implementation, and the first case where they disagree is shrunk down to a
+minimal failing case before being reported.
+
+The seed and budget can be changed with the EQUIVALENCE_SEED and
+EQUIVALENCE_TIME_BUDGET (seconds per check) environment variables, e.g. to run
+a longer search locally.
+"""
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, Iterator, Optional, TypeVar
+
+from calendar_event import CalendarEvent
+from event_parser import date_format_str
+
+
+T = TypeVar("T")
+
+DEFAULT_SEED = 20230302
+DEFAULT_TIME_BUDGET = 1.0
+
+# A Thursday, so that random days cover Friday to Monday and the weekend
+base_date = datetime(year=2023, month=3, day=2)
+
+# Times of day (in minutes) at or either side of the 09:00 and 18:00 boundaries
+boundary_minutes = [
+    0,
+    8 * 60 + 59,
+    9 * 60,
+    9 * 60 + 1,
+    17 * 60 + 59,
+    18 * 60,
+    18 * 60 + 1,
+]
+boundary_durations = [0, 1, 15, 30, 60, 90, 8 * 60 + 59, 9 * 60, 9 * 60 + 1, 15 * 60]
+
+
+class EquivalenceFailure(AssertionError):
+    pass
+
+
+def check_equivalence(
+    reference: Callable[[list[T]], object],
+    candidate: Callable[[list[T]], object],
+    generate: Callable[[random.Random], list[T]],
+    simplify: Optional[Callable[[T], Iterable[T]]] = None,
+    is_valid: Callable[[list[T]], bool] = lambda _: True,
+    time_budget: Optional[float] = None,
+    seed: Optional[int] = None,
+) -> int:
+    """Checks that candidate gives the same result as reference for random cases
+    until the time budget runs out.
+
+    Args:
+        reference (Callable[[list[T]], object]): The oracle implementation
+        candidate (Callable[[list[T]], object]): The implementation to check
+        generate (Callable[[random.Random], list[T]]): Generates a random case
+        simplify (Callable[[T], Iterable[T]], optional): Gives simpler versions
+        of an item in a case, used when shrinking
+        is_valid (Callable[[list[T]], bool], optional): Whether a (shrunk) case
+        still meets the preconditions of the implementations
+        time_budget (float, optional): Seconds to spend generating cases
+        seed (int, optional): The seed of the first case
+
+    Raises:
+        EquivalenceFailure: Raised with the shrunk case if the results differ
+
+    Returns:
+        int: The number of cases checked
+    """
+    if time_budget is None:
+        time_budget = float(
+            os.environ.get("EQUIVALENCE_TIME_BUDGET", DEFAULT_TIME_BUDGET)
+        )
+    if seed is None:
+        seed = int(os.environ.get("EQUIVALENCE_SEED", DEFAULT_SEED))
+
+    def fails(case: list[T]) -> bool:
+        return is_valid(case) and run(reference, case) != run(candidate, case)
+
+    deadline = time.monotonic() + time_budget
+    case_count = 0
+    while not case_count or time.monotonic() < deadline:
+        case_seed = seed + case_count
+        case = generate(random.Random(case_seed))
+        case_count += 1
+        if not fails(case):
+            continue
+
+        shrunk_case = shrink(case, fails, simplify)
+        raise EquivalenceFailure(
+            f"Results differ for seed {case_seed}, shrunk from {len(case)} to "
+            f"{len(shrunk_case)} items:\n"
+            f"  case:      {shrunk_case!r}\n"
+            f"  reference: {run(reference, shrunk_case)!r}\n"
+            f"  candidate: {run(candidate, shrunk_case)!r}"
+        )
+
+    return case_count
+
+
+def run(function: Callable[[list[T]], object], case: list[T]) -> object:
+    """Runs a function on a copy of the case, treating raising an exception as
+    a result so that implementations must also fail the same way.
+    """
+    try:
+        return function(list(case))
+    except Exception as exception:
+        return ("raised", type(exception))
+
+
+def shrink(
+    case: list[T],
+    fails: Callable[[list[T]], bool],
+    simplify: Optional[Callable[[T], Iterable[T]]] = None,
+) -> list[T]:
+    """Shrinks a failing case by repeatedly removing chunks of items (largest
+    first) and replacing items with simpler versions, for as long as it keeps
+    failing.
+    """
+    has_shrunk = True
+    while has_shrunk:
+        has_shrunk = False
+
+        chunk_size = len(case) // 2
+        while chunk_size >= 1:
+            index = 0
+            while index < len(case):
+                smaller_case = case[:index] + case[index + chunk_size :]
+                if fails(smaller_case):
+                    case = smaller_case
+                    has_shrunk = True
+                else:
+                    index += chunk_size
+            chunk_size //= 2
+
+        if not simplify:
+            continue
+
+        for index in range(len(case)):
+            for simpler_item in simplify(case[index]):
+                simpler_case = case[:index] + [simpler_item] + case[index + 1 :]
+                if fails(simpler_case):
+                    case = simpler_case
+                    has_shrunk = True
+                    break
+
+    return case
+
+
+def random_date(rng: random.Random) -> datetime:
+    """A random date within two weeks of base_date, biased towards the 09:00
+    and 18:00 boundaries and to whole quarter hours.
+    """
+    day = base_date + timedelta(days=rng.randrange(14))
+    roll = rng.random()
+    if roll < 0.3:
+        minute_of_day = rng.choice(boundary_minutes)
+    elif roll < 0.8:
+        minute_of_day = rng.randrange(9 * 4, 18 * 4) * 15
+    else:
+        minute_of_day = rng.randrange(24 * 60)
+
+    return day + timedelta(minutes=minute_of_day)
+
+
+def random_duration(rng: random.Random) -> timedelta:
+    roll = rng.random()
+    if roll < 0.3:
+        return timedelta(minutes=rng.choice(boundary_durations))
+    if roll < 0.95:
+        return timedelta(minutes=rng.randrange(1, 16) * 15)
+
+    return timedelta(days=rng.randrange(1, 4), minutes=rng.randrange(24 * 60))
+
+
+def random_event(rng: random.Random, name: str) -> CalendarEvent:
+    start_date = random_date(rng)
+    event: CalendarEvent = {
+        "start_date": start_date,
+        "end_date": start_date + random_duration(rng),
+        "name": name,
+    }
+    if rng.random() < 0.25:
+        event["priority"] = rng.randrange(-1, 3)
+    if rng.random() < 0.1:
+        # Events can't be given an empty duration
+        event["duration"] = timedelta(minutes=rng.choice(boundary_durations[1:]))
+
+    return event
+
+
+def generate_calendar(rng: random.Random, max_events: int = 30) -> list[CalendarEvent]:
+    """A random calendar of events, with some exact duplicates"""
+    events = []
+    for index in range(rng.randrange(max_events + 1)):
+        if events and rng.random() < 0.05:
+            events.append(dict(rng.choice(events)))
+        else:
+            events.append(random_event(rng, f"Event {index}"))
+
+    return events
+
+
+def generate_valid_schedule(
+    rng: random.Random, max_days: int = 8
+) -> list[CalendarEvent]:
+    """A random schedule meeting the preconditions of slot_into_schedule: sorted,
+    inside Mon-Fri 09:00-18:00 and not overlapping.
+    """
+    days = sorted(rng.sample(range(21), rng.randrange(max_days + 1)))
+    schedule = []
+    for day in days:
+        date = base_date + timedelta(days=day)
+        if date.isoweekday() in [6, 7]:
+            continue
+
+        # Pick an even number of boundaries within the day to pair up into events
+        boundaries = sorted(
+            rng.sample(range(9 * 4, 18 * 4 + 1), 2 * rng.randrange(1, 5))
+        )
+        for start, end in zip(boundaries[::2], boundaries[1::2]):
+            schedule.append(
+                {
+                    "start_date": date + timedelta(minutes=start * 15),
+                    "end_date": date + timedelta(minutes=end * 15),
+                    "name": f"Event {len(schedule)}",
+                }
+            )
+
+    return schedule
+
+
+def simplify_event(event: CalendarEvent) -> Iterator[CalendarEvent]:
+    """Simpler versions of an event: without its options, shorter, and moved to
+    09:00 of the same day.
+    """
+    for key in ["priority", "duration"]:
+        if key in event:
+            yield {x: y for x, y in event.items() if x != key}  # type: ignore[misc]
+
+    duration = event["end_date"] - event["start_date"]
+    for simpler_duration in [timedelta(minutes=60), timedelta(minutes=15)]:
+        if simpler_duration < duration:
+            yield {**event, "end_date": event["start_date"] + simpler_duration}
+
+    start_of_day = event["start_date"].replace(hour=9, minute=0)
+    if event["start_date"] != start_of_day:
+        yield {**event, "start_date": start_of_day, "end_date": start_of_day + duration}
+
+
+def format_line(event: CalendarEvent) -> str:
+    """Formats an event as a line of input, e.g. to stream it through
+    iter_pipelined_schedule
+    """
+    options = []
+    if "priority" in event:
+        options.append(f'priority={event["priority"]}')
+    if "duration" in event:
+        options.append(f'duration={int(event["duration"].total_seconds()) // 60}')
+    suffix = f' [{", ".join(options)}]' if options else ""
+
+    start_date = event["start_date"].strftime(date_format_str)
+    end_date = event["end_date"].strftime(date_format_str)
+    return f'{start_date} -> {end_date} - {event["name"]}{suffix}'
@@ -0,0 +1,137 @@
+from operator import itemgetter
+import random
+from typing import Optional
+
+import pytest
+
+import reference_reschedule
+from calendar_event import CalendarEvent
+from equivalence import (
+    EquivalenceFailure,
+    check_equivalence,
+    format_line,
+    generate_calendar,
+    generate_valid_schedule,
+    random_event,
+    simplify_event,
+)
+from memory_budget import MemoryBudget
+from pipeline import iter_pipelined_schedule
+from reschedule import adjust_event_schedule, does_events_overlap, slot_into_schedule
+from timeline import Timeline
+
+
+def pipelined_schedule(
+    events: list[CalendarEvent], memory_budget: Optional[MemoryBudget] = None
+) -> list[CalendarEvent]:
+    lines = [format_line(x) for x in events]
+    batches = iter_pipelined_schedule(
+        lines, batch_size=4, queue_size=2, memory_budget=memory_budget
+    )
+    return [event for batch in batches for event in batch]
+
+
+# Every optimised path gets checked against the reference implementation, so add
+# new ones here
+adjust_event_schedule_paths = {
+    "adjust_event_schedule": adjust_event_schedule,
+    "iter_pipelined_schedule": pipelined_schedule,
+    "timeline": lambda x: adjust_event_schedule(x, backend="timeline"),
+    # A budget of a few events, so that most calendars spill to several runs
+    "memory_budget": lambda x: pipelined_schedule(x, MemoryBudget(2_000)),
+}
+slot_into_schedule_paths = {
+    "slot_into_schedule": slot_into_schedule,
+}
+does_events_overlap_paths = {
+    "does_events_overlap": does_events_overlap,
+}
+
+
+def is_valid_schedule(events: list[CalendarEvent]) -> bool:
+    return (
+        events == sorted(events, key=itemgetter("start_date"))
+        and all(reference_reschedule.is_inside_hours(x) for x in events)
+        and not any(
+            reference_reschedule.does_events_overlap(x, y)
+            for x, y in zip(events, events[1:])
+        )
+    )
+
+
+def generate_slot_case(rng: random.Random) -> list[CalendarEvent]:
+    # The first event is the one to slot into the rest of the schedule
+    return [random_event(rng, "Event")] + generate_valid_schedule(rng)
+
+
+class TestEquivalence:
+    @pytest.mark.parametrize(
+        "candidate",
+        adjust_event_schedule_paths.values(),
+        ids=adjust_event_schedule_paths.keys(),
+    )
+    def test_adjust_event_schedule(self, candidate):
+        check_equivalence(
+            reference_reschedule.adjust_event_schedule,
+            candidate,
+            generate_calendar,
+            simplify=simplify_event,
+        )
+
+    def test_timeline_without_falling_back(self):
+        # Most random calendars have an event the timeline can't hold, which
+        # makes it fall back to the list backend, so also check without those
+        check_equivalence(
+            reference_reschedule.adjust_event_schedule,
+            lambda x: adjust_event_schedule(x, backend="timeline"),
+            lambda rng: [
+                x for x in generate_calendar(rng, max_events=60) if Timeline.can_hold(x)
+            ],
+            simplify=simplify_event,
+            is_valid=lambda x: all(Timeline.can_hold(y) for y in x),
+        )
+
+    @pytest.mark.parametrize(
+        "candidate",
+        slot_into_schedule_paths.values(),
+        ids=slot_into_schedule_paths.keys(),
+    )
+    def test_slot_into_schedule(self, candidate):
+        check_equivalence(
+            lambda x: reference_reschedule.slot_into_schedule(x[0], x[1:]),
+            lambda x: candidate(x[0], x[1:]),
+            generate_slot_case,
+            simplify=simplify_event,
+            is_valid=lambda x: len(x) > 0 and is_valid_schedule(x[1:]),
+        )
+
+    @pytest.mark.parametrize(
+        "candidate",
+        does_events_overlap_paths.values(),
+        ids=does_events_overlap_paths.keys(),
+    )
+    def test_does_events_overlap(self, candidate):
+        check_equivalence(
+            lambda x: reference_reschedule.does_events_overlap(*x),
+            lambda x: candidate(*x),
+            lambda rng: [random_event(rng, "Event 1"), random_event(rng, "Event 2")],
+            simplify=simplify_event,
+            is_valid=lambda x: len(x) == 2,
+        )
+
+
+class TestCheckEquivalence:
+    def test_finds_and_shrinks_difference(self):
+        # Resolving overlaps by the last encountered event should be caught with
+        # just the two overlapping events left
+        def last_encountered_wins(events: list[CalendarEvent]) -> list[CalendarEvent]:
+            return reference_reschedule.adjust_event_schedule(list(reversed(events)))
+
+        with pytest.raises(EquivalenceFailure, match="shrunk from .* to 2 items"):
+            check_equivalence(
+                reference_reschedule.adjust_event_schedule,
+                last_encountered_wins,
+                generate_calendar,
+                simplify=simplify_event,
+                time_budget=5,
+            )
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import pytest
 
@@ -20,6 +20,57 @@ class TestParseLine:
 
         assert parse_line(line) == expected_result
 
+    def test_parse_options_suffix(self):
+        line = "2022/08/23 15:00 -> 2022/08/23 16:00 - Meet Jamie [priority=2, duration=30]"
+        start_date = datetime(year=2022, month=8, day=23, hour=15)
+        end_date = datetime(year=2022, month=8, day=23, hour=16)
+        expected_result = {
+            "start_date": start_date,
+            "end_date": end_date,
+            "name": "Meet Jamie",
+            "priority": 2,
+            "duration": timedelta(minutes=30),
+        }
+
+        assert parse_line(line) == expected_result
+
+    @pytest.mark.parametrize(
+        "name",
+        [
+            "Meet Jamie [tbc]",
+            "Standup [team=core]",
+            # Only known options are split off, all or nothing
+            "Standup [priority=1, team=core]",
+        ],
+    )
+    def test_parse_brackets_without_options_as_name(self, name: str):
+        line = f"2022/08/23 15:00 -> 2022/08/23 16:00 - {name}"
+
+        assert parse_line(line) == {
+            "start_date": datetime(year=2022, month=8, day=23, hour=15),
+            "end_date": datetime(year=2022, month=8, day=23, hour=16),
+            "name": name,
+        }
+
+    @pytest.mark.parametrize(
+        "line",
+        [
+            # priority not an integer
+            "2022/08/23 15:00 -> 2022/08/23 16:00 - Meet Jamie [priority=high]",
+            # negative duration
+            "2022/08/23 15:00 -> 2022/08/23 16:00 - Meet Jamie [duration=-5]",
+            # empty duration
+            "2022/08/23 15:00 -> 2022/08/23 16:00 - Meet Jamie [duration=0]",
+            # repeated option
+            "2022/08/23 15:00 -> 2022/08/23 16:00 - Meet Jamie [priority=1, priority=2]",
+            # no name before the options
+            "2022/08/23 15:00 -> 2022/08/23 16:00 - [priority=1]",
+        ],
+    )
+    def test_raise_when_options_incorrect(self, line: str):
+        with pytest.raises(ParseLineException):
+            parse_line(line)
+
     @pytest.mark.parametrize(
         "line",
         [
@@ -0,0 +1,89 @@
+import pytest
+from click.testing import CliRunner
+
+from main import main
+
+
+lines = [
+    "2023/03/02 10:00 -> 2023/03/02 11:00 - Event 1",
+    "2023/03/02 10:30 -> 2023/03/02 11:30 - Event 2",
+    "2023/03/04 10:00 -> 2023/03/04 11:00 - Event 3",
+]
+expected_lines = [
+    "2023/03/02 10:00 -> 2023/03/02 11:00 - Event 1",
+    "2023/03/02 11:00 -> 2023/03/02 12:00 - Event 2",
+    "2023/03/02 12:00 -> 2023/03/02 13:00 - Event 3",
+]
+
+
+def make_runner() -> CliRunner:
+    """A runner that keeps stdout and stderr apart, which click 8.2 does by
+    default and 8.1 needs asking for
+    """
+    try:
+        return CliRunner(mix_stderr=False)  # type: ignore[call-arg]
+    except TypeError:
+        return CliRunner()
+
+
+class TestMainWithInput:
+    @pytest.mark.parametrize(
+        "options",
+        [
+            [],
+            ["--backend", "timeline"],
+            ["--memory-limit", "1"],
+        ],
+    )
+    def test_only_schedule_on_stdout(self, options: list[str]):
+        runner = make_runner()
+        result = runner.invoke(main, ["--input", "-", *options], input="\n".join(lines))
+
+        assert result.exit_code == 0
+        assert result.stdout.splitlines() == expected_lines
+        assert "Scheduled 3 events." in result.stderr
+
+    def test_only_changes_on_stdout(self):
+        runner = make_runner()
+        result = runner.invoke(main, ["--input", "-", "--diff"], input="\n".join(lines))
+
+        assert result.exit_code == 0
+        assert [x.split(": ", 1)[1] for x in result.stdout.splitlines()] == [
+            "2023/03/02 10:30 -> 2023/03/02 11:30 => 2023/03/02 11:00 -> "
+            "2023/03/02 12:00 - Event 2",
+            "2023/03/04 10:00 -> 2023/03/04 11:00 => 2023/03/02 12:00 -> "
+            "2023/03/02 13:00 - Event 3",
+        ]
+        assert "Scheduled 3 events." in result.stderr
+
+    def test_memory_limit_only_when_streaming(self):
+        runner = make_runner()
+        result = runner.invoke(
+            main,
+            ["--input", "-", "--memory-limit", "1", "--diff"],
+            input="\n".join(lines),
+        )
+
+        assert result.exit_code == 2
+        assert "--memory-limit" in result.stderr
+        assert result.stdout == ""
+
+    @pytest.mark.parametrize(
+        "options",
+        [
+            [],
+            ["--diff"],
+            ["--backend", "timeline"],
+        ],
+    )
+    def test_parse_errors_not_on_stdout(self, options: list[str]):
+        runner = make_runner()
+        result = runner.invoke(
+            main,
+            ["--input", "-", *options],
+            input="\n".join([*lines, "not an event"]),
+        )
+
+        assert result.exit_code == 1
+        assert result.stdout == ""
+        assert '"not an event"' in result.stderr
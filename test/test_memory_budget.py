@@ -0,0 +1,147 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from calendar_event import CalendarEvent
+from equivalence import format_line, generate_calendar
+from event_parser import iter_events
+from memory_budget import MemoryBudget, SpillingHeap, approximate_event_size
+from pipeline import iter_pipelined_schedule
+from reschedule import adjust_event_schedule
+
+
+test_date = datetime(year=2023, month=3, day=2)
+
+
+def make_event(index: int) -> CalendarEvent:
+    start_date = test_date + timedelta(hours=index)
+    return {
+        "start_date": start_date,
+        "end_date": start_date + timedelta(hours=1),
+        "name": f"Event {index}",
+    }
+
+
+class TestMemoryBudget:
+    def test_peak(self):
+        memory_budget = MemoryBudget(100)
+        memory_budget.reserve(80)
+        memory_budget.release(50)
+        memory_budget.reserve(30)
+
+        assert memory_budget.used == 60
+        assert memory_budget.peak == 80
+        assert not memory_budget.is_exceeded
+
+        memory_budget.reserve(41)
+        assert memory_budget.is_exceeded
+
+    @pytest.mark.parametrize("limit", [0, -1])
+    def test_raise_non_positive_limit(self, limit: int):
+        with pytest.raises(ValueError):
+            MemoryBudget(limit)
+
+
+class TestSpillingHeap:
+    items = [(index % 3, -index, index, make_event(index)) for index in range(20)]
+
+    def test_without_budget(self):
+        heap: SpillingHeap = SpillingHeap()
+        for item in self.items:
+            heap.push(item)
+
+        assert heap.run_count == 0
+        assert list(heap.pop_all()) == sorted(self.items)
+        assert len(heap) == 0
+
+    def test_spill(self):
+        event_size = approximate_event_size(self.items[0][-1])
+        memory_budget = MemoryBudget(3 * event_size)
+        heap: SpillingHeap = SpillingHeap(memory_budget)
+        for item in self.items:
+            memory_budget.reserve(approximate_event_size(item[-1]))
+            heap.push(item)
+
+        assert heap.run_count > 1
+        assert len(heap) == len(self.items)
+        assert sorted(heap) == sorted(self.items)
+        assert memory_budget.peak <= 4 * event_size
+
+        # Items read back from disk are reserved again
+        assert list(heap.pop_all()) == sorted(self.items)
+        assert len(heap) == 0
+        assert memory_budget.used > 4 * event_size
+
+
+class TestIterPipelinedScheduleWithinBudget:
+    @pytest.mark.parametrize("with_priorities", [False, True])
+    def test_same_as_in_memory(self, with_priorities: bool):
+        lines = [
+            format_line(event)
+            for seed in range(20)
+            for event in generate_calendar(random.Random(seed), max_events=100)
+            if with_priorities or "priority" not in event
+        ]
+        memory_budget = MemoryBudget(20_000)
+        expected_result = adjust_event_schedule(iter_events(lines))
+        batches = iter_pipelined_schedule(lines, memory_budget=memory_budget)
+
+        assert [event for batch in batches for event in batch] == expected_result
+        assert memory_budget.spilled_runs > 0
+        assert memory_budget.peak > 0
+
+    def test_events_are_released_once_written(self):
+        monday = test_date + timedelta(days=4)
+        lines = []
+        for index in range(80):
+            # Every other event is in the evening, so has to be rescheduled
+            hour = 9 + index // 2 % 8 if index % 2 == 0 else 19 + index // 2 % 4
+            start_date = monday + timedelta(days=index // 16, hours=hour)
+            lines.append(
+                format_line(
+                    {
+                        "start_date": start_date,
+                        "end_date": start_date + timedelta(hours=1),
+                        "name": f"Event {index}",
+                    }
+                )
+            )
+        memory_budget = MemoryBudget(4_000)
+        batches = iter_pipelined_schedule(lines, memory_budget=memory_budget)
+
+        assert sum(len(batch) for batch in batches) == len(lines)
+        assert memory_budget.spilled_runs > 0
+        assert memory_budget.used < memory_budget.peak
+
+    @pytest.mark.parametrize("with_priorities", [False, True])
+    def test_overlapping_events_are_spilled(self, with_priorities: bool):
+        monday = test_date + timedelta(days=4)
+        lines = []
+        for index in range(1_000):
+            # Ten events at the same time each weekday, nine of which overlap
+            # so have to be rescheduled later that day
+            day = monday + timedelta(weeks=index // 50, days=index // 10 % 5)
+            start_date = day.replace(hour=10)
+            event: CalendarEvent = {
+                "start_date": start_date,
+                "end_date": start_date + timedelta(minutes=30),
+                "name": f"Event {index}",
+            }
+            if with_priorities and index == 0:
+                # So that candidates can't be checked as they stream in
+                event["priority"] = 1
+            lines.append(format_line(event))
+        unlimited_budget = MemoryBudget(10**9)
+        expected_result = [
+            event
+            for batch in iter_pipelined_schedule(lines, memory_budget=unlimited_budget)
+            for event in batch
+        ]
+        memory_budget = MemoryBudget(20_000)
+        batches = iter_pipelined_schedule(lines, memory_budget=memory_budget)
+
+        assert [event for batch in batches for event in batch] == expected_result
+        assert unlimited_budget.spilled_runs == 0
+        assert memory_budget.peak < unlimited_budget.peak / 4
+        assert memory_budget.peak < 4 * memory_budget.limit
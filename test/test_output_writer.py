@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+from io import StringIO
+
+import pytest
+
+from calendar_event import CalendarEvent
+from output_writer import format_events, write_columnar, write_events
+
+
+test_date = datetime(year=2023, month=3, day=2)
+
+
+def make_events(count: int) -> list[CalendarEvent]:
+    return [
+        {
+            "start_date": test_date + timedelta(minutes=97 * x),
+            "end_date": test_date + timedelta(minutes=97 * x + 45),
+            "name": f"Event {x}",
+        }
+        for x in range(count)
+    ]
+
+
+class TestFormatEvents:
+    def test_matches_strftime(self):
+        events = make_events(2_000)
+        expected_result = "".join(
+            f'{x["start_date"]:%Y/%m/%d %H:%M} -> {x["end_date"]:%Y/%m/%d %H:%M}'
+            f' - {x["name"]}\n'
+            for x in events
+        )
+
+        assert "".join(format_events(events)) == expected_result
+
+    def test_chunks(self):
+        chunks = list(format_events(make_events(25), chunk_size=10))
+
+        assert [x.count("\n") for x in chunks] == [10, 10, 5]
+
+    def test_no_events(self):
+        assert list(format_events([])) == []
+
+
+class TestWriteEvents:
+    def test_write(self):
+        stream = StringIO()
+        write_events(make_events(2), stream)
+
+        assert stream.getvalue() == (
+            "2023/03/02 00:00 -> 2023/03/02 00:45 - Event 0\n"
+            "2023/03/02 01:37 -> 2023/03/02 02:22 - Event 1\n"
+        )
+
+
+class TestWriteColumnar:
+    def test_write_parquet(self, tmp_path):
+        parquet = pytest.importorskip("pyarrow.parquet")
+        events = make_events(3)
+        path = str(tmp_path / "schedule.parquet")
+        write_columnar(events, path)
+
+        assert parquet.read_table(path).to_pylist() == events
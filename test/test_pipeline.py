@@ -0,0 +1,40 @@
+import threading
+
+import pytest
+
+from event_parser import ParseMessageException, parse_into_events
+from pipeline import iter_pipelined_schedule
+from reschedule import adjust_event_schedule
+
+
+lines = [
+    "2023/03/02 10:00 -> 2023/03/02 11:00 - Event 1",
+    "2023/03/02 10:30 -> 2023/03/02 11:30 - Event 2",
+    "2023/03/04 10:00 -> 2023/03/04 11:00 - Event 3",
+    "2023/03/03 17:30 -> 2023/03/03 18:30 - Event 4 [priority=1]",
+    "2023/03/06 09:00 -> 2023/03/06 12:00 - Event 5",
+]
+
+
+class TestIterPipelinedSchedule:
+    def test_same_as_adjust_event_schedule(self):
+        expected_result = adjust_event_schedule(parse_into_events("\n".join(lines)))
+        batches = list(iter_pipelined_schedule(lines, batch_size=2, queue_size=1))
+
+        assert [event for batch in batches for event in batch] == expected_result
+        assert all(0 < len(batch) <= 2 for batch in batches)
+
+    def test_raise_parse_errors(self):
+        with pytest.raises(ParseMessageException) as exception_info:
+            list(iter_pipelined_schedule(lines + ["Not an event"]))
+
+        assert exception_info.value.lines_and_errors == [
+            ("Not an event", "Line is not structured correctly")
+        ]
+
+    def test_stops_stages_when_closed_early(self):
+        batches = iter_pipelined_schedule(lines * 100, batch_size=1, queue_size=1)
+        next(batches)
+        batches.close()
+
+        assert not any(x.name.startswith("pipeline-") for x in threading.enumerate())
@@ -3,7 +3,12 @@ from datetime import datetime, timedelta
 import pytest
 from calendar_event import CalendarEvent
 
-from reschedule import date_is_inside_hours, does_events_overlap, slot_into_schedule
+from reschedule import (
+    adjust_event_schedule,
+    date_is_inside_hours,
+    does_events_overlap,
+    slot_into_schedule,
+)
 
 
 test_date = datetime(year=2023, month=3, day=2)
@@ -356,3 +361,119 @@ class TestSlotIntoSchedule:
         }
         events = slot_into_schedule(event, [event_1, event_2, event_3])
         assert events == [event_1, event_2, readjusted_event, event_3]
+
+
+class TestAdjustEventSchedule:
+    def test_first_encountered_wins_on_equal_priority(self):
+        event_1: CalendarEvent = {
+            "start_date": test_date.replace(hour=10, minute=0),
+            "end_date": test_date.replace(hour=11, minute=0),
+            "name": "Event 1",
+        }
+        event_2: CalendarEvent = {
+            "start_date": test_date.replace(hour=10, minute=30),
+            "end_date": test_date.replace(hour=11, minute=30),
+            "name": "Event 2",
+        }
+        readjusted_event: CalendarEvent = {
+            "start_date": test_date.replace(hour=11, minute=0),
+            "end_date": test_date.replace(hour=12, minute=0),
+            "name": "Event 2",
+        }
+        events = adjust_event_schedule([event_1, event_2])
+        assert events == [event_1, readjusted_event]
+
+    def test_higher_priority_keeps_slot(self):
+        event_1: CalendarEvent = {
+            "start_date": test_date.replace(hour=10, minute=0),
+            "end_date": test_date.replace(hour=11, minute=0),
+            "name": "Event 1",
+        }
+        event_2: CalendarEvent = {
+            "start_date": test_date.replace(hour=10, minute=30),
+            "end_date": test_date.replace(hour=11, minute=30),
+            "name": "Event 2",
+            "priority": 1,
+        }
+        readjusted_event: CalendarEvent = {
+            "start_date": test_date.replace(hour=9, minute=30),
+            "end_date": test_date.replace(hour=10, minute=30),
+            "name": "Event 1",
+        }
+        events = adjust_event_schedule([event_1, event_2])
+        assert events == [readjusted_event, event_2]
+
+    def test_higher_priority_rescheduled_first(self):
+        event_1: CalendarEvent = {
+            "start_date": test_date.replace(hour=9, minute=0),
+            "end_date": test_date.replace(hour=17, minute=0),
+            "name": "Event 1",
+            "priority": 2,
+        }
+        event_2: CalendarEvent = {
+            "start_date": test_date.replace(hour=10, minute=0),
+            "end_date": test_date.replace(hour=11, minute=0),
+            "name": "Event 2",
+        }
+        event_3: CalendarEvent = {
+            "start_date": test_date.replace(hour=11, minute=0),
+            "end_date": test_date.replace(hour=12, minute=0),
+            "name": "Event 3",
+            "priority": 1,
+        }
+        readjusted_event_3: CalendarEvent = {
+            **event_3,
+            "start_date": test_date.replace(hour=17, minute=0),
+            "end_date": test_date.replace(hour=18, minute=0),
+        }
+        next_day = test_date + timedelta(days=+1)
+        readjusted_event_2: CalendarEvent = {
+            "start_date": next_day.replace(hour=9, minute=0),
+            "end_date": next_day.replace(hour=10, minute=0),
+            "name": "Event 2",
+        }
+        events = adjust_event_schedule([event_1, event_2, event_3])
+        assert events == [event_1, readjusted_event_3, readjusted_event_2]
+
+    def test_reschedule_with_duration(self):
+        event_1: CalendarEvent = {
+            "start_date": test_date.replace(hour=10, minute=0),
+            "end_date": test_date.replace(hour=11, minute=0),
+            "name": "Event 1",
+        }
+        event_2: CalendarEvent = {
+            "start_date": test_date.replace(hour=10, minute=0),
+            "end_date": test_date.replace(hour=12, minute=0),
+            "name": "Event 2",
+            "duration": timedelta(minutes=30),
+        }
+        readjusted_event: CalendarEvent = {
+            **event_2,
+            "start_date": test_date.replace(hour=11, minute=0),
+            "end_date": test_date.replace(hour=11, minute=30),
+        }
+        events = adjust_event_schedule([event_1, event_2])
+        assert events == [event_1, readjusted_event]
+
+    def test_timeline_backend(self):
+        event_1: CalendarEvent = {
+            "start_date": test_date.replace(hour=10, minute=0),
+            "end_date": test_date.replace(hour=11, minute=0),
+            "name": "Event 1",
+        }
+        event_2: CalendarEvent = {
+            "start_date": test_date.replace(hour=10, minute=30),
+            "end_date": test_date.replace(hour=11, minute=30),
+            "name": "Event 2",
+        }
+        readjusted_event: CalendarEvent = {
+            "start_date": test_date.replace(hour=11, minute=0),
+            "end_date": test_date.replace(hour=12, minute=0),
+            "name": "Event 2",
+        }
+        events = adjust_event_schedule([event_1, event_2], backend="timeline")
+        assert events == [event_1, readjusted_event]
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            adjust_event_schedule([], backend="tree")  # type: ignore[arg-type]
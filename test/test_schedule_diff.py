@@ -0,0 +1,115 @@
+from datetime import datetime
+
+import pytest
+
+from calendar_event import CalendarEvent
+from reschedule import adjust_event_schedule
+from schedule_diff import assign_event_ids, track_schedule_changes
+
+
+test_date = datetime(year=2023, month=3, day=2)
+
+
+class TestAssignEventIds:
+    def test_ids_are_stable(self):
+        event_1: CalendarEvent = {
+            "start_date": test_date.replace(hour=9, minute=0),
+            "end_date": test_date.replace(hour=10, minute=0),
+            "name": "Event 1",
+        }
+        event_2: CalendarEvent = {
+            "start_date": test_date.replace(hour=11, minute=0),
+            "end_date": test_date.replace(hour=12, minute=0),
+            "name": "Event 2",
+        }
+        ids = [x["id"] for x in assign_event_ids([event_1, event_2])]
+        reordered_ids = [x["id"] for x in assign_event_ids([event_2, event_1])]
+
+        assert ids == list(reversed(reordered_ids))
+
+    def test_duplicate_events_get_different_ids(self):
+        event: CalendarEvent = {
+            "start_date": test_date.replace(hour=9, minute=0),
+            "end_date": test_date.replace(hour=10, minute=0),
+            "name": "Event",
+        }
+        events = assign_event_ids([event, event])
+
+        assert events[0]["id"] != events[1]["id"]
+        assert len(events[0]["id"]) == 40
+
+
+class TestTrackScheduleChanges:
+    @pytest.mark.parametrize("backend", ["list", "timeline"])
+    def test_only_rescheduled_events_are_rescheduled(self, backend):
+        event_1: CalendarEvent = {
+            "start_date": test_date.replace(hour=10, minute=0),
+            "end_date": test_date.replace(hour=11, minute=0),
+            "name": "Event 1",
+        }
+        event_2: CalendarEvent = {
+            "start_date": test_date.replace(hour=10, minute=30),
+            "end_date": test_date.replace(hour=11, minute=30),
+            "name": "Event 2",
+        }
+        events = assign_event_ids([event_1, event_2])
+        rescheduled_ids: set[str] = set()
+        scheduled_events = adjust_event_schedule(events, backend, rescheduled_ids)
+        changes = list(
+            track_schedule_changes(events, scheduled_events, rescheduled_ids)
+        )
+
+        assert changes == [
+            {
+                "id": events[0]["id"],
+                "name": "Event 1",
+                "original_start_date": event_1["start_date"],
+                "original_end_date": event_1["end_date"],
+                "start_date": event_1["start_date"],
+                "end_date": event_1["end_date"],
+                "rescheduled": False,
+            },
+            {
+                "id": events[1]["id"],
+                "name": "Event 2",
+                "original_start_date": event_2["start_date"],
+                "original_end_date": event_2["end_date"],
+                "start_date": test_date.replace(hour=11, minute=0),
+                "end_date": test_date.replace(hour=12, minute=0),
+                "rescheduled": True,
+            },
+        ]
+
+    @pytest.mark.parametrize("backend", ["list", "timeline"])
+    def test_first_rescheduled_event_is_rescheduled(self, backend):
+        # With nothing scheduled yet, the first event to be rescheduled keeps
+        # its times but still counts as rescheduled
+        saturday = test_date.replace(day=4)
+        event_1: CalendarEvent = {
+            "start_date": saturday.replace(hour=10, minute=0),
+            "end_date": saturday.replace(hour=11, minute=0),
+            "name": "Event 1",
+        }
+        event_2: CalendarEvent = {
+            "start_date": saturday.replace(day=5, hour=10, minute=0),
+            "end_date": saturday.replace(day=5, hour=11, minute=0),
+            "name": "Event 2",
+        }
+        events = assign_event_ids([event_1, event_2])
+        rescheduled_ids: set[str] = set()
+        scheduled_events = adjust_event_schedule(events, backend, rescheduled_ids)
+        changes = track_schedule_changes(events, scheduled_events, rescheduled_ids)
+
+        assert [x["rescheduled"] for x in changes] == [True, True]
+        assert all(x is not y for x, y in zip(scheduled_events, events))
+
+    def test_raise_duplicate_ids(self):
+        event: CalendarEvent = {
+            "start_date": test_date.replace(hour=9, minute=0),
+            "end_date": test_date.replace(hour=10, minute=0),
+            "name": "Event",
+            "id": "1",
+        }
+
+        with pytest.raises(ValueError):
+            list(track_schedule_changes([event, dict(event)], [event], set()))
@@ -0,0 +1,171 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from calendar_event import CalendarEvent
+from schedule_query import ScheduleIndex
+
+
+test_date = datetime(year=2023, month=3, day=2)
+friday = test_date + timedelta(days=+1)
+monday = test_date + timedelta(days=+4)
+
+events: list[CalendarEvent] = [
+    {
+        "start_date": test_date.replace(hour=9, minute=0),
+        "end_date": test_date.replace(hour=10, minute=0),
+        "name": "Event 1",
+    },
+    {
+        "start_date": test_date.replace(hour=10, minute=0),
+        "end_date": test_date.replace(hour=12, minute=0),
+        "name": "Event 2",
+    },
+    {
+        "start_date": test_date.replace(hour=12, minute=20),
+        "end_date": test_date.replace(hour=17, minute=30),
+        "name": "Event 3",
+    },
+    {
+        "start_date": friday.replace(hour=9, minute=0),
+        "end_date": friday.replace(hour=17, minute=45),
+        "name": "Event 4",
+    },
+    {
+        "start_date": monday.replace(hour=9, minute=30),
+        "end_date": monday.replace(hour=10, minute=0),
+        "name": "Event 5",
+    },
+]
+index = ScheduleIndex(events)
+
+
+class TestIsFree:
+    @pytest.mark.parametrize(
+        ["start_date", "end_date"],
+        [
+            # Before everything
+            (test_date.replace(hour=8), test_date.replace(hour=9)),
+            # Between events on the same day
+            (test_date.replace(hour=12), test_date.replace(hour=12, minute=20)),
+            # Over the weekend
+            (friday.replace(hour=17, minute=45), monday.replace(hour=9, minute=30)),
+            # After everything
+            (monday.replace(hour=10), monday.replace(hour=18)),
+        ],
+    )
+    def test_free(self, start_date: datetime, end_date: datetime):
+        assert index.is_free(start_date, end_date) is True
+
+    @pytest.mark.parametrize(
+        ["start_date", "end_date"],
+        [
+            # Overlapping the end of an event
+            (
+                test_date.replace(hour=11, minute=59),
+                test_date.replace(hour=12, minute=10),
+            ),
+            # Inside an event
+            (friday.replace(hour=10), friday.replace(hour=11)),
+            # Encompassing an event
+            (monday.replace(hour=9), monday.replace(hour=11)),
+        ],
+    )
+    def test_busy(self, start_date: datetime, end_date: datetime):
+        assert index.is_free(start_date, end_date) is False
+
+    def test_are_free(self):
+        start_dates = [test_date.replace(hour=8), friday.replace(hour=10)]
+        end_dates = [test_date.replace(hour=9), friday.replace(hour=11)]
+
+        assert index.are_free(start_dates, end_dates) == [True, False]
+
+    def test_are_free_without_events(self):
+        empty_index = ScheduleIndex([])
+
+        assert empty_index.are_free([test_date], [friday]) == [True]
+
+
+class TestEventsBetween:
+    def test_events_between(self):
+        events_between = index.events_between(
+            test_date.replace(hour=10), test_date.replace(hour=12, minute=30)
+        )
+
+        assert events_between == events[1:3]
+
+    def test_no_events_between(self):
+        assert (
+            index.events_between(friday.replace(hour=18), monday.replace(hour=9)) == []
+        )
+
+
+class TestNextFreeSlot:
+    @pytest.mark.parametrize(
+        ["after", "duration", "expected_result"],
+        [
+            # Fits straight away
+            (
+                test_date.replace(hour=12, minute=5),
+                timedelta(minutes=10),
+                test_date.replace(hour=12, minute=5),
+            ),
+            # Fits between events on the same day
+            (
+                test_date.replace(hour=9),
+                timedelta(minutes=20),
+                test_date.replace(hour=12),
+            ),
+            # Skips gaps that are too short
+            (
+                test_date.replace(hour=9),
+                timedelta(minutes=30),
+                test_date.replace(hour=17, minute=30),
+            ),
+            # Skips the weekend
+            (friday.replace(hour=9), timedelta(minutes=30), monday.replace(hour=9)),
+            # Skips to after the last event
+            (monday.replace(hour=9), timedelta(hours=9), monday.replace(day=7, hour=9)),
+        ],
+    )
+    def test_next_free_slot(
+        self, after: datetime, duration: timedelta, expected_result
+    ):
+        assert index.next_free_slot(after, duration) == expected_result
+
+    def test_longer_than_working_day(self):
+        assert index.next_free_slot(test_date, timedelta(hours=9, minutes=1)) is None
+
+    def test_raise_when_not_positive(self):
+        with pytest.raises(ValueError):
+            index.next_free_slot(test_date, timedelta())
+
+    def test_next_free_slots(self):
+        afters = [test_date.replace(hour=9), friday.replace(hour=9)]
+
+        assert index.next_free_slots(afters, timedelta(minutes=30)) == [
+            test_date.replace(hour=17, minute=30),
+            monday.replace(hour=9),
+        ]
+
+    def test_next_free_slots_same_as_next_free_slot(self):
+        rng = random.Random(0)
+        afters = [
+            test_date
+            + timedelta(days=rng.randrange(-2, 10), minutes=rng.randrange(1440))
+            for _ in range(200)
+        ]
+        for duration in [timedelta(minutes=x) for x in [1, 30, 60, 9 * 60, 9 * 60 + 1]]:
+            assert index.next_free_slots(afters, duration) == [
+                index.next_free_slot(x, duration) for x in afters
+            ]
+
+    def test_next_free_slots_without_events(self):
+        afters = [friday.replace(hour=17, minute=45), test_date.replace(hour=12)]
+
+        assert ScheduleIndex([]).next_free_slots(afters, timedelta(minutes=30)) == [
+            monday.replace(hour=9),
+            test_date.replace(hour=12),
+        ]
+        assert index.next_free_slots([], timedelta(minutes=30)) == []
@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from calendar_event import CalendarEvent
+from timeline import DayBucket, Timeline
+
+
+test_date = datetime(year=2023, month=3, day=2)
+
+
+def make_event(start_hour: int, start_minute: int, end_hour: int, end_minute: int):
+    event: CalendarEvent = {
+        "start_date": test_date.replace(hour=start_hour, minute=start_minute),
+        "end_date": test_date.replace(hour=end_hour, minute=end_minute),
+        "name": "Event",
+    }
+    return event
+
+
+class TestDayBucket:
+    bucket = DayBucket(test_date)
+    bucket.add(make_event(9, 0, 10, 0))
+    bucket.add(make_event(10, 30, 11, 0))
+    bucket.add(make_event(12, 0, 13, 0))
+
+    @pytest.mark.parametrize(
+        ["event", "expected"],
+        [
+            [make_event(10, 0, 10, 30), False],
+            [make_event(9, 59, 10, 1), True],
+            [make_event(17, 0, 18, 0), False],
+            [make_event(11, 0, 12, 30), True],
+        ],
+    )
+    def test_overlaps(self, event: CalendarEvent, expected: bool):
+        assert self.bucket.overlaps(event) is expected
+
+    @pytest.mark.parametrize(
+        ["from_index", "minutes", "expected"],
+        [
+            [1, 30, 1],
+            [1, 31, 2],
+            [2, 30, 2],
+            [1, 60, 2],
+            [1, 61, None],
+            # There's no event after the time left at the end of the day
+            [3, 30, None],
+        ],
+    )
+    def test_find_gap(self, from_index: int, minutes: int, expected):
+        assert self.bucket.find_gap(from_index, minutes) == expected
+
+
+class TestTimeline:
+    @pytest.mark.parametrize(
+        ["event", "expected"],
+        [
+            [make_event(9, 0, 18, 0), True],
+            [make_event(9, 0, 9, 0), False],
+            [{**make_event(9, 0, 10, 0), "duration": timedelta(seconds=90)}, False],
+            [{**make_event(9, 0, 10, 0), "duration": timedelta(hours=10)}, False],
+            [
+                {
+                    **make_event(9, 0, 10, 0),
+                    "end_date": test_date.replace(hour=10, second=30),
+                },
+                False,
+            ],
+        ],
+    )
+    def test_can_hold(self, event: CalendarEvent, expected: bool):
+        assert Timeline.can_hold(event) is expected
+
+    def test_find_first_after(self):
+        timeline = Timeline()
+        timeline.add(make_event(10, 0, 11, 0))
+        timeline.add(make_event(12, 0, 13, 0))
+        next_day = test_date + timedelta(days=1)
+        timeline.add(
+            {
+                "start_date": next_day.replace(hour=9),
+                "end_date": next_day.replace(hour=10),
+                "name": "Event",
+            }
+        )
+
+        assert timeline.find_first_after(test_date.replace(hour=9)) == (0, 0)
+        assert timeline.find_first_after(test_date.replace(hour=10)) == (0, 1)
+        assert timeline.find_first_after(test_date.replace(hour=12)) == (1, 0)
+        assert timeline.find_first_after(next_day.replace(hour=9)) == (2, 0)
+        assert len(timeline) == 3
+        assert timeline.day_count == 2